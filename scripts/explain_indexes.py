@@ -0,0 +1,108 @@
+"""Print query plans of the per user bet queries, without and with their indexes.
+
+Run it against a populated database, ideally a copy of production:
+
+    python -m scripts.explain_indexes
+
+Indexes are dropped inside a transaction which is rolled back, nothing is
+changed, but the tables are locked meanwhile: do not run it on a live server.
+"""
+
+from sqlalchemy import Connection, Executable, select, text, update
+
+from yak_server.database.models import (
+    BinaryBetModel,
+    GroupPositionModel,
+    MatchModel,
+    Role,
+    ScoreBetModel,
+    UserModel,
+)
+from yak_server.database.session import build_engine
+
+INDEXES = (
+    "ix_match_user_id_group_id_index",
+    "ix_score_bet_match_id",
+    "ix_binary_bet_match_id",
+    "ix_group_position_user_id_group_id",
+    "ix_group_position_user_id_team_id",
+)
+
+
+def sample_queries(connection: Connection) -> dict[str, Executable]:
+    user_id, group_id, team_id = connection.execute(
+        select(MatchModel.user_id, MatchModel.group_id, MatchModel.team1_id)
+        .join(UserModel, UserModel.id == MatchModel.user_id)
+        .where(UserModel.role == Role.USER, MatchModel.team1_id.is_not(None))
+        .limit(1),
+    ).one()
+
+    user_matches = select(MatchModel.id).where(
+        MatchModel.user_id == user_id,
+        MatchModel.group_id == group_id,
+    )
+
+    return {
+        "score bets of a group": (
+            select(ScoreBetModel)
+            .join(ScoreBetModel.match)
+            .where(MatchModel.user_id == user_id, MatchModel.group_id == group_id)
+            .order_by(MatchModel.index)
+        ),
+        "binary bets of matches": select(BinaryBetModel).where(
+            BinaryBetModel.match_id.in_(user_matches),
+        ),
+        "group positions of a group": select(GroupPositionModel).where(
+            GroupPositionModel.user_id == user_id,
+            GroupPositionModel.group_id == group_id,
+        ),
+        "recomputation flag of a team": (
+            update(GroupPositionModel)
+            .values(need_recomputation=True)
+            .where(
+                GroupPositionModel.team_id == team_id,
+                GroupPositionModel.user_id == user_id,
+                GroupPositionModel.need_recomputation.is_(False),
+            )
+        ),
+    }
+
+
+def explain(connection: Connection, statement: Executable) -> str:
+    compiled = statement.compile(dialect=connection.dialect)  # type: ignore[attr-defined]
+
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) {compiled}",
+        compiled.params,
+    )
+
+    return "\n".join(line for (line,) in plan)
+
+
+def main() -> None:
+    engine = build_engine()
+
+    with engine.connect() as connection:
+        queries = sample_queries(connection)
+        connection.rollback()
+
+        for name, statement in queries.items():
+            # EXPLAIN ANALYZE runs the statement, the update must not be kept either
+            with connection.begin() as transaction:
+                for index in INDEXES:
+                    connection.execute(text(f'DROP INDEX IF EXISTS "{index}"'))
+
+                before = explain(connection, statement)
+
+                transaction.rollback()
+
+            with connection.begin() as transaction:
+                after = explain(connection, statement)
+
+                transaction.rollback()
+
+            print(f"=== {name}\n--- without indexes\n{before}\n--- with indexes\n{after}\n")  # ruff:ignore[print]
+
+
+if __name__ == "__main__":
+    main()
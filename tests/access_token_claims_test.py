@@ -0,0 +1,86 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+import jwt
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string
+from yak_server.cli.admin import create_admin
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+
+def test_access_token_claims(
+    app_with_valid_jwt_config: "FastAPI", engine_for_test: "Engine", signup_token: str
+) -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    password = get_random_string(9)
+    name = get_random_string(6)
+
+    create_admin(password, engine_for_test)
+
+    response_login_admin = client.post(
+        "/api/v1/users/login",
+        json={"name": "admin", "password": password},
+    )
+
+    assert response_login_admin.status_code == HTTPStatus.CREATED
+
+    admin_access_token = response_login_admin.json()["result"]["access_token"]
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": name,
+            "first_name": get_random_string(6),
+            "last_name": get_random_string(6),
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    user_id = response_signup.json()["result"]["id"]
+    access_token = response_signup.json()["result"]["access_token"]
+
+    # Role and token version are carried by the token itself
+    claims = jwt.decode(access_token, options={"verify_signature": False})
+
+    assert (claims["sub"], claims["name"], claims["role"], claims["ver"]) == (
+        user_id,
+        name,
+        "user",
+        0,
+    )
+
+    response_results = client.get(
+        "/api/v1/results",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response_results.status_code == HTTPStatus.OK
+
+    # Password change bumps the token version
+    response_modify_password = client.patch(
+        f"/api/v1/users/{user_id}",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+        json={"password": get_random_string(15)},
+    )
+
+    assert response_modify_password.status_code == HTTPStatus.OK
+
+    # Error case : tokens issued before the change are rejected, also by endpoints
+    # not loading the user row
+    for endpoint in ("/api/v1/results", "/api/v1/bets"):
+        response = client.get(endpoint, headers={"Authorization": f"Bearer {access_token}"})
+
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert response.json() == {
+            "ok": False,
+            "error_code": "invalid_token",
+            "description": "Invalid access token, authentication required",
+        }
@@ -1,4 +1,5 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 from typing import TYPE_CHECKING
 
@@ -299,3 +300,74 @@ def test_refresh_token_revoked_after_logout(
         "error_code": "invalid_refresh_token",
         "description": "Invalid refresh token, re-authentication required",
     }
+
+
+def test_refresh_token_reuse(app_with_valid_jwt_config: "FastAPI", signup_token: str) -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    response = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(10),
+            "first_name": get_random_string(10),
+            "last_name": get_random_string(10),
+            "password": get_random_string(150),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+    refresh_token = response.json()["result"]["refresh_token"]
+
+    response = client.post("/api/v1/users/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == HTTPStatus.CREATED
+
+    new_refresh_token = response.json()["result"]["refresh_token"]
+
+    # Error case : rotated token is presented again
+    response = client.post("/api/v1/users/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json()["error_code"] == "invalid_refresh_token"
+
+    # Reuse revokes the whole session, including the token issued by the rotation
+    response = client.post("/api/v1/users/refresh", json={"refresh_token": new_refresh_token})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json()["error_code"] == "invalid_refresh_token"
+
+
+def test_concurrent_refresh(app_with_valid_jwt_config: "FastAPI", signup_token: str) -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    response = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(10),
+            "first_name": get_random_string(10),
+            "last_name": get_random_string(10),
+            "password": get_random_string(150),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+    refresh_token = response.json()["result"]["refresh_token"]
+
+    def refresh(_: int) -> int:
+        return (
+            TestClient(app_with_valid_jwt_config)
+            .post("/api/v1/users/refresh", json={"refresh_token": refresh_token})
+            .status_code
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        status_codes = list(executor.map(refresh, range(4)))
+
+    # Only one rotation of a given token can succeed
+    assert sorted(status_codes) == [
+        HTTPStatus.CREATED,
+        HTTPStatus.UNAUTHORIZED,
+        HTTPStatus.UNAUTHORIZED,
+        HTTPStatus.UNAUTHORIZED,
+    ]
@@ -339,6 +339,7 @@ def test_compute_points(
                 "points": 5.0,
             },
         ],
+        "next_cursor": None,
     }
 
     # Patch admin score bets so all groups are not filled
@@ -428,6 +429,7 @@ def test_compute_points(
                 "points": 0.0,
             },
         ],
+        "next_cursor": None,
     }
 
 
@@ -0,0 +1,207 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from starlette.testclient import TestClient
+
+from testing.util import (
+    UserData,
+    get_random_string,
+    get_resources_path,
+    patch_score_bets,
+)
+from yak_server.cli.admin import create_admin
+from yak_server.cli.database import initialize_database
+from yak_server.helpers.leaderboard import refresh_leaderboard
+from yak_server.helpers.rules import compute_points
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+    from sqlalchemy.orm import Session
+
+    from yak_server.helpers.rules import Rules
+
+
+def get_score_board(client: TestClient, access_token: str) -> dict[str, Any]:
+    response_score_board = client.get(
+        "/api/v1/score_board",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response_score_board.status_code == HTTPStatus.OK
+
+    score_board: dict[str, Any] = response_score_board.json()["result"]
+
+    return score_board
+
+
+def test_compute_points_incremental(
+    app_and_rules_for_compute_points: tuple["FastAPI", "Rules"],
+    engine_for_test: "Engine",
+    signup_token: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    app, _ = app_and_rules_for_compute_points
+
+    client = TestClient(app)
+
+    initialize_database(engine_for_test, get_resources_path("test_compute_points_v1"))
+
+    password = get_random_string(15)
+
+    admin = UserData(
+        first_name="admin",
+        last_name="admin",
+        name="admin",
+        scores=[(1, 2), (5, 1), (5, 5)],
+    )
+
+    create_admin(password, engine_for_test)
+
+    response_login_admin = client.post(
+        "/api/v1/users/login",
+        json={"name": admin.name, "password": password},
+    )
+
+    assert response_login_admin.status_code == HTTPStatus.CREATED
+
+    admin.access_token = response_login_admin.json()["result"]["access_token"]
+
+    patch_score_bets(client, admin.access_token, admin.scores)
+
+    users_data = [
+        UserData(
+            first_name=get_random_string(15),
+            last_name=get_random_string(15),
+            name="user1",
+            scores=[(2, 2), (5, 1), (5, 5)],
+        ),
+        UserData(
+            first_name=get_random_string(15),
+            last_name=get_random_string(15),
+            name="user2",
+            scores=[(2, 0), (2, 0), (1, 4)],
+        ),
+        UserData(
+            first_name=get_random_string(15),
+            last_name=get_random_string(15),
+            name="user3",
+            scores=[(0, 2), (2, 0), (1, 1)],
+        ),
+    ]
+
+    for user_data in users_data:
+        response_signup = client.post(
+            "/api/v1/users/signup",
+            json={
+                "name": user_data.name,
+                "first_name": user_data.first_name,
+                "last_name": user_data.last_name,
+                "password": get_random_string(18),
+                "signup_token": signup_token,
+            },
+        )
+
+        assert response_signup.status_code == HTTPStatus.CREATED
+
+        user_data.access_token = response_signup.json()["result"]["access_token"]
+
+        patch_score_bets(client, user_data.access_token, user_data.scores)
+
+    response_compute_points = client.post(
+        "/api/v1/rules/62d46542-8cf1-4a3b-af77-a5086f10ac59",
+        headers={"Authorization": f"Bearer {admin.access_token}"},
+    )
+
+    assert response_compute_points.status_code == HTTPStatus.OK
+
+    score_board_before = get_score_board(client, users_data[0].access_token)
+
+    # Admin fixes the first result without changing the group rank, only this match is rescored
+    patch_score_bets(client, admin.access_token, [(0, 2), (5, 1), (5, 5)])
+
+    score_board_incremental = get_score_board(client, users_data[0].access_token)
+
+    assert score_board_incremental != score_board_before
+
+    response_compute_points = client.post(
+        "/api/v1/rules/62d46542-8cf1-4a3b-af77-a5086f10ac59",
+        headers={"Authorization": f"Bearer {admin.access_token}"},
+    )
+
+    assert response_compute_points.status_code == HTTPStatus.OK
+
+    assert get_score_board(client, users_data[0].access_token) == score_board_incremental
+
+    # Admin fixes two results at once, the leaderboard is rebuilt a single time
+    refresh_leaderboard_calls = 0
+
+    def count_refresh_leaderboard(db: "Session") -> None:
+        nonlocal refresh_leaderboard_calls
+        refresh_leaderboard_calls += 1
+        refresh_leaderboard(db)
+
+    monkeypatch.setattr(compute_points, "refresh_leaderboard", count_refresh_leaderboard)
+
+    response_get_all_bets = client.get(
+        "/api/v1/bets",
+        headers={"Authorization": f"Bearer {admin.access_token}"},
+    )
+
+    assert response_get_all_bets.status_code == HTTPStatus.OK
+
+    admin_score_bets = response_get_all_bets.json()["result"]["score_bets"]
+
+    response_bulk_patch = client.patch(
+        "/api/v1/score_bets",
+        headers={"Authorization": f"Bearer {admin.access_token}"},
+        json=[
+            {"id": admin_score_bets[0]["id"], "team1": {"score": 1}, "team2": {"score": 2}},
+            {"id": admin_score_bets[1]["id"], "team1": {"score": 2}, "team2": {"score": 0}},
+        ],
+    )
+
+    assert response_bulk_patch.status_code == HTTPStatus.OK
+    assert refresh_leaderboard_calls == 1
+
+    score_board_bulk = get_score_board(client, users_data[0].access_token)
+
+    assert score_board_bulk != score_board_incremental
+
+    response_compute_points = client.post(
+        "/api/v1/rules/62d46542-8cf1-4a3b-af77-a5086f10ac59",
+        headers={"Authorization": f"Bearer {admin.access_token}"},
+    )
+
+    assert response_compute_points.status_code == HTTPStatus.OK
+
+    assert get_score_board(client, users_data[0].access_token) == score_board_bulk
+
+    # A player signed up since points were computed, points of every match depend on the
+    # number of players so all users are scored again instead of only the patched match
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": "user4",
+            "first_name": get_random_string(15),
+            "last_name": get_random_string(15),
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    patch_score_bets(client, admin.access_token, [(0, 2), None, None])
+
+    score_board_new_player = get_score_board(client, users_data[0].access_token)
+
+    response_compute_points = client.post(
+        "/api/v1/rules/62d46542-8cf1-4a3b-af77-a5086f10ac59",
+        headers={"Authorization": f"Bearer {admin.access_token}"},
+    )
+
+    assert response_compute_points.status_code == HTTPStatus.OK
+
+    assert get_score_board(client, users_data[0].access_token) == score_board_new_player
@@ -211,6 +211,7 @@ def test_compute_points(
                 "points": 131.0,
             },
         ],
+        "next_cursor": None,
     }
 
     # Push finale phase bets
@@ -278,6 +279,7 @@ def test_compute_points(
                 "points": 131.0,
             },
         ],
+        "next_cursor": None,
     }
 
     # Success case : check user GET /results call
@@ -58,7 +58,8 @@ def _apply_standard_overrides(app: "FastAPI", signup_token: str) -> None:
     app.dependency_overrides[get_lock_datetime] = MockLockDatetime(
         datetime.now(UTC) + timedelta(minutes=10),
     )
-    app.dependency_overrides[get_rules] = Rules
+    # Rules fields would otherwise be read as body parameters of the overridden endpoints
+    app.dependency_overrides[get_rules] = lambda: Rules()  # ruff:ignore[unnecessary-lambda]
 
 
 def create_test_database() -> Engine:
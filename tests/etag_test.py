@@ -0,0 +1,127 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string, get_resources_path, patch_score_bets
+from yak_server.cli.admin import create_admin
+from yak_server.cli.database import initialize_database
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+    from yak_server.helpers.rules import Rules
+
+
+def test_etag(
+    app_and_rules_for_compute_points: tuple["FastAPI", "Rules"],
+    engine_for_test: "Engine",
+    signup_token: str,
+) -> None:
+    app, _ = app_and_rules_for_compute_points
+
+    client = TestClient(app)
+
+    initialize_database(engine_for_test, get_resources_path("test_compute_points_v1"))
+
+    password = get_random_string(15)
+
+    create_admin(password, engine_for_test)
+
+    response_login_admin = client.post(
+        "/api/v1/users/login",
+        json={"name": "admin", "password": password},
+    )
+
+    assert response_login_admin.status_code == HTTPStatus.CREATED
+
+    admin_access_token = response_login_admin.json()["result"]["access_token"]
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(6),
+            "first_name": get_random_string(10),
+            "last_name": get_random_string(8),
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    access_token = response_signup.json()["result"]["access_token"]
+
+    authentication_header = {"Authorization": f"Bearer {access_token}"}
+
+    # Success case : unchanged resources answer 304 without body
+    for endpoint in ["/api/v1/bets/", "/api/v1/groups/", "/api/v1/teams/", "/api/v1/rules"]:
+        response = client.get(endpoint, headers=authentication_header)
+
+        assert response.status_code == HTTPStatus.OK
+        assert "ETag" in response.headers
+
+        response_not_modified = client.get(
+            endpoint,
+            headers={**authentication_header, "If-None-Match": response.headers["ETag"]},
+        )
+
+        assert response_not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert response_not_modified.headers["ETag"] == response.headers["ETag"]
+        assert response_not_modified.content == b""
+
+    # Success case : ETag depends on the language
+    response_groups_fr = client.get("/api/v1/groups/", headers=authentication_header)
+    response_groups_en = client.get(
+        "/api/v1/groups/",
+        params={"lang": "en"},
+        headers={
+            **authentication_header,
+            "If-None-Match": response_groups_fr.headers["ETag"],
+        },
+    )
+
+    assert response_groups_en.status_code == HTTPStatus.OK
+    assert response_groups_en.headers["ETag"] != response_groups_fr.headers["ETag"]
+
+    # Success case : modifying a bet changes the bets ETag
+    response_bets = client.get("/api/v1/bets/", headers=authentication_header)
+
+    patch_score_bets(client, access_token, [(1, 2)])
+
+    response_modified_bets = client.get(
+        "/api/v1/bets/",
+        headers={**authentication_header, "If-None-Match": response_bets.headers["ETag"]},
+    )
+
+    assert response_modified_bets.status_code == HTTPStatus.OK
+    assert response_modified_bets.headers["ETag"] != response_bets.headers["ETag"]
+    assert response_modified_bets.json()["result"]["score_bets"][0]["team1"]["score"] == 1
+
+    # Success case : computing points changes the score board ETag
+    response_score_board = client.get("/api/v1/score_board", headers=authentication_header)
+
+    assert response_score_board.status_code == HTTPStatus.OK
+
+    response_score_board_not_modified = client.get(
+        "/api/v1/score_board",
+        headers={**authentication_header, "If-None-Match": response_score_board.headers["ETag"]},
+    )
+
+    assert response_score_board_not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+    response_compute_points = client.post(
+        "/api/v1/rules/62d46542-8cf1-4a3b-af77-a5086f10ac59",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+    )
+
+    assert response_compute_points.status_code == HTTPStatus.OK
+
+    response_computed_score_board = client.get(
+        "/api/v1/score_board",
+        headers={**authentication_header, "If-None-Match": response_score_board.headers["ETag"]},
+    )
+
+    assert response_computed_score_board.status_code == HTTPStatus.OK
+    assert len(response_computed_score_board.json()["result"]["results"]) == 1
@@ -0,0 +1,150 @@
+from http import HTTPStatus
+from threading import Event, Thread
+from typing import TYPE_CHECKING
+
+import pytest
+from argon2 import PasswordHasher
+from sqlalchemy import select
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string
+from yak_server.database import models
+from yak_server.database.models import UserModel
+from yak_server.database.session import build_local_session_maker
+from yak_server.helpers.password_hasher import (
+    PasswordHashingBusyError,
+    PasswordHashingPool,
+    get_password_hasher,
+)
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+
+class BlockingPasswordHasher(PasswordHasher):
+    def __init__(self) -> None:
+        super().__init__()
+        self.block = False
+        self.started = Event()
+        self.release = Event()
+
+    def hash(self, password: str | bytes, *, salt: bytes | None = None) -> str:
+        if self.block:
+            self.started.set()
+            self.release.wait(timeout=10)
+
+        return super().hash(password, salt=salt)
+
+
+def test_password_hashing_pool_back_pressure(
+    app_with_valid_jwt_config: "FastAPI",
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    hasher = BlockingPasswordHasher()
+    pool = PasswordHashingPool(hasher, workers=1, max_queue=0)
+
+    hasher.block = True
+    blocked_job = Thread(target=pool.hash, args=("password",))
+    blocked_job.start()
+    hasher.started.wait(timeout=10)
+
+    metrics = pool.metrics()
+    assert (metrics.running, metrics.queued, metrics.rejected) == (1, 0, 0)
+
+    # Error case : pool is saturated, new jobs are rejected without waiting
+    with pytest.raises(PasswordHashingBusyError):
+        pool.hash("other_password")
+
+    assert pool.metrics().rejected == 1
+
+    monkeypatch.setattr(models, "get_password_hasher", lambda: pool)
+
+    client = TestClient(app_with_valid_jwt_config)
+
+    response_login = client.post(
+        "/api/v1/users/login",
+        json={"name": "unknown", "password": "password"},
+    )
+
+    assert response_login.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response_login.json() == {
+        "ok": False,
+        "error_code": "service_unavailable",
+        "description": "Too many authentications in progress. Please try again later.",
+    }
+
+    hasher.release.set()
+    blocked_job.join(timeout=10)
+
+    # Success case : pool accepts jobs again once the worker is free
+    hasher.block = False
+
+    assert pool.verify(pool.hash("password"), "password") is True
+
+    metrics = pool.metrics()
+    assert (metrics.running, metrics.queued, metrics.rejected) == (0, 0, 2)
+
+
+def test_rehash_password_on_login(
+    app_with_valid_jwt_config: "FastAPI",
+    engine_for_test: "Engine",
+    signup_token: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    name = get_random_string(6)
+    password = get_random_string(15)
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": name,
+            "first_name": get_random_string(6),
+            "last_name": get_random_string(6),
+            "password": password,
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    local_session_maker = build_local_session_maker(engine_for_test)
+
+    def get_password_hash() -> str:
+        with local_session_maker() as db:
+            return db.scalars(select(UserModel.password).where(UserModel.name == name)).one()
+
+    old_password_hash = get_password_hash()
+
+    # Parameters are raised after signup, stored hash is upgraded on next login
+    monkeypatch.setenv("PASSWORD_HASHING_TIME_COST", "1")
+    get_password_hasher.cache_clear()
+
+    try:
+        assert get_password_hasher().needs_rehash(old_password_hash) is True
+
+        response_login = client.post(
+            "/api/v1/users/login",
+            json={"name": name, "password": password},
+        )
+
+        assert response_login.status_code == HTTPStatus.CREATED
+
+        new_password_hash = get_password_hash()
+
+        assert new_password_hash != old_password_hash
+        assert ",t=1," in new_password_hash
+        assert get_password_hasher().needs_rehash(new_password_hash) is False
+
+        # Success case : upgraded hash still authenticates
+        response_login = client.post(
+            "/api/v1/users/login",
+            json={"name": name, "password": password},
+        )
+
+        assert response_login.status_code == HTTPStatus.CREATED
+        assert get_password_hash() == new_password_hash
+    finally:
+        get_password_hasher.cache_clear()
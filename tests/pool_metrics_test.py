@@ -0,0 +1,66 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.testclient import TestClient
+
+from yak_server.database.pool import InstrumentedQueuePool
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+
+def test_pool_metrics(engine_for_test: "Engine") -> None:
+    engine = create_engine(
+        engine_for_test.url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.1,
+    )
+
+    before = InstrumentedQueuePool.stats.metrics()
+
+    with engine.connect(), engine.connect():
+        metrics = InstrumentedQueuePool.stats.metrics()
+
+        # Success case : second connection is taken from the overflow
+        assert metrics.checkouts == before.checkouts + 2
+        assert metrics.checked_out == 2
+        assert metrics.overflow == 1
+        assert metrics.peak_overflow >= 1
+
+        # Error case : pool and overflow are exhausted
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    metrics = InstrumentedQueuePool.stats.metrics()
+
+    assert metrics.timeouts == before.timeouts + 1
+    assert metrics.checked_out == 0
+    assert metrics.wait_max_ms >= 100
+
+    engine.dispose()
+
+
+def test_pool_status(app_with_valid_jwt_config: "FastAPI") -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    client.get("/api/health/")
+
+    response = client.get("/api/health/pool")
+
+    assert response.status_code == HTTPStatus.OK
+
+    pools = {pool["name"]: pool for pool in response.json()["result"]["pools"]}
+
+    assert set(pools) == {"sync", "async", "async_read_replica"}
+    assert pools["sync"]["checkouts"] >= 1
+
+    password_hashing = response.json()["result"]["password_hashing"]
+
+    assert password_hashing["workers"] >= 1
+    assert password_hashing["running"] == 0
@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import Generator
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string, get_resources_path
+from yak_server.cli.database import initialize_database
+from yak_server.database.pool import InstrumentedAsyncReplicaQueuePool
+from yak_server.database.session import build_async_session_maker
+from yak_server.database.settings import get_postgres_settings, get_read_replica_settings
+from yak_server.helpers.database import ReadReplica, get_read_replica
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+
+@pytest.fixture
+def read_replica(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    # Primary stands in for the replica, it reports no lag
+    monkeypatch.setenv("READ_REPLICA_HOST", get_postgres_settings().host)
+
+    get_read_replica_settings.cache_clear()
+    get_read_replica.cache_clear()
+
+    yield
+
+    get_read_replica_settings.cache_clear()
+    get_read_replica.cache_clear()
+
+
+@pytest.mark.usefixtures("read_replica")
+def test_bets_read_from_replica(
+    app_with_valid_jwt_config: "FastAPI", engine_for_test: "Engine", signup_token: str
+) -> None:
+    initialize_database(engine_for_test, get_resources_path("test_modify_bet_v2"))
+
+    client = TestClient(app_with_valid_jwt_config)
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(10),
+            "first_name": get_random_string(5),
+            "last_name": get_random_string(8),
+            "password": get_random_string(15),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    authentication_token = response_signup.json()["result"]["access_token"]
+
+    checkouts = InstrumentedAsyncReplicaQueuePool.stats.metrics().checkouts
+
+    response_bets = client.get(
+        "/api/v1/bets",
+        headers={"Authorization": f"Bearer {authentication_token}"},
+    )
+
+    assert response_bets.status_code == HTTPStatus.OK
+    assert response_bets.json()["result"]["score_bets"]
+
+    # Lag check and bets query
+    assert InstrumentedAsyncReplicaQueuePool.stats.metrics().checkouts == checkouts + 2
+
+
+def test_read_replica_fallback(engine_for_test: "Engine") -> None:
+    session_maker = build_async_session_maker(
+        create_async_engine(engine_for_test.url, poolclass=NullPool),
+    )
+
+    async def check(max_lag: float) -> bool:
+        read_replica = ReadReplica(session_maker, max_lag=max_lag, check_interval=60)
+
+        return await read_replica.session_maker() is session_maker
+
+    # Success case : replica is up to date
+    assert asyncio.run(check(max_lag=0)) is True
+
+    # Error case : replica lags too much, reads go to the primary
+    assert asyncio.run(check(max_lag=-1)) is False
+
+    unreachable_session_maker = build_async_session_maker(
+        create_async_engine(engine_for_test.url.set(port=1), poolclass=NullPool),
+    )
+
+    # Error case : replica is unreachable
+    assert (
+        asyncio.run(
+            ReadReplica(unreachable_session_maker, max_lag=0, check_interval=1).session_maker(),
+        )
+        is None
+    )
@@ -0,0 +1,113 @@
+import asyncio
+from http import HTTPStatus
+from threading import Thread
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string, get_resources_path
+from yak_server.cli.database import initialize_database
+from yak_server.database.models import TeamModel
+from yak_server.database.session import build_async_session_maker, build_local_session_maker
+from yak_server.helpers import version_counter
+from yak_server.helpers.reference_data import (
+    ReferenceData,
+    invalidate_reference_data,
+    reference_data_cache,
+    reload_reference_data,
+)
+from yak_server.helpers.version_counter import get_shared_versions
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+
+def test_reference_data_cache(
+    app_with_valid_jwt_config: "FastAPI",
+    engine_for_test: "Engine",
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    initialize_database(engine_for_test, get_resources_path("test_matches_db"))
+
+    now = 0.0
+    monkeypatch.setattr(version_counter, "monotonic", lambda: now)
+    get_shared_versions().expire()
+
+    client = TestClient(app_with_valid_jwt_config)
+
+    response_all_teams = client.get("/api/v1/teams")
+
+    assert response_all_teams.status_code == HTTPStatus.OK
+
+    team = response_all_teams.json()["result"]["teams"][0]
+
+    new_description = get_random_string(20)
+
+    with engine_for_test.begin() as connection:
+        connection.execute(
+            update(TeamModel)
+            .where(TeamModel.id == team["id"])
+            .values(description_fr=new_description),
+        )
+
+    # Teams are served from the process cache until the reference data version changes
+    response_cached_team = client.get(f"/api/v1/teams/{team['id']}")
+
+    assert response_cached_team.status_code == HTTPStatus.OK
+    assert response_cached_team.json()["result"]["team"] == team
+
+    # As done by `yak db init` from another process, this process cache is not touched
+    with build_local_session_maker(engine_for_test)() as db:
+        invalidate_reference_data(db)
+        db.commit()
+
+    # Success case : the old teams are served until the check interval elapses
+    response_cached_team = client.get(f"/api/v1/teams/{team['id']}")
+
+    assert response_cached_team.status_code == HTTPStatus.OK
+    assert response_cached_team.json()["result"]["team"] == team
+
+    now = 60.0
+
+    response_reloaded_team = client.get(f"/api/v1/teams/{team['id']}")
+
+    assert response_reloaded_team.status_code == HTTPStatus.OK
+    assert response_reloaded_team.json()["result"]["team"] == {
+        **team,
+        "description": new_description,
+    }
+
+
+def test_reference_data_concurrent_cold_cache(engine_for_test: "Engine") -> None:
+    initialize_database(engine_for_test, get_resources_path("test_matches_db"))
+
+    reload_reference_data()
+
+    async def load_concurrently() -> list[ReferenceData]:
+        engine = create_async_engine(engine_for_test.url)
+        session_maker = build_async_session_maker(engine)
+
+        async def load() -> ReferenceData:
+            async with session_maker() as db:
+                return await reference_data_cache.get(db)
+
+        try:
+            return await asyncio.gather(*(load() for _ in range(8)))
+        finally:
+            await engine.dispose()
+
+    results: list[list[ReferenceData]] = []
+
+    # A deadlock blocks the event loop thread itself, run it aside to be able to time out
+    worker = Thread(target=lambda: results.append(asyncio.run(load_concurrently())), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+
+    assert not worker.is_alive(), "Concurrent cold cache lookups deadlocked"
+    assert len(results) == 1
+    assert len({reference_data.version for reference_data in results[0]}) == 1
+    assert results[0][0].teams
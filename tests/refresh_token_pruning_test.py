@@ -0,0 +1,96 @@
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+from click.testing import CliRunner
+from sqlalchemy import select
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string
+from yak_server.cli import app
+from yak_server.database.models import RefreshTokenModel
+from yak_server.database.session import build_local_session_maker
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+runner = CliRunner()
+
+
+def test_prune_refresh_tokens(
+    app_with_valid_jwt_config: "FastAPI", engine_for_test: "Engine", signup_token: str
+) -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(6),
+            "first_name": get_random_string(6),
+            "last_name": get_random_string(6),
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    user_id = response_signup.json()["result"]["id"]
+
+    # Rotation revokes the signup token
+    response_refresh = client.post(
+        "/api/v1/users/refresh",
+        json={"refresh_token": response_signup.json()["result"]["refresh_token"]},
+    )
+
+    assert response_refresh.status_code == HTTPStatus.CREATED
+
+    local_session_maker = build_local_session_maker(engine_for_test)
+
+    expired_token_ids = [uuid4() for _ in range(3)]
+
+    with local_session_maker() as db:
+        db.add_all(
+            RefreshTokenModel(
+                id=expired_token_id,
+                user_id=user_id,
+                revoked=False,
+                replaced_by_token=None,
+                expires_at=datetime.now(UTC) - timedelta(minutes=1),
+            )
+            for expired_token_id in expired_token_ids
+        )
+        db.commit()
+
+        unexpired_token_ids = set(db.scalars(select(RefreshTokenModel.id))) - set(expired_token_ids)
+
+    # Active token and the rotated signup token
+    assert len(unexpired_token_ids) == 2
+
+    # Success case : expired tokens are deleted in batches, rotated ones are kept
+    result = runner.invoke(app, ["db", "prune-tokens", "--batch-size", "2"])
+
+    assert result.exit_code == 0
+    assert result.output == "3 refresh tokens deleted\n"
+
+    with local_session_maker() as db:
+        assert set(db.scalars(select(RefreshTokenModel.id))) == unexpired_token_ids
+
+    # Success case : nothing left to delete
+    result = runner.invoke(app, ["db", "prune-tokens"])
+
+    assert result.exit_code == 0
+    assert result.output == "0 refresh tokens deleted\n"
+
+    # Error case : replaying the rotated token is still detected after pruning
+    response_replay = client.post(
+        "/api/v1/users/refresh",
+        json={"refresh_token": response_signup.json()["result"]["refresh_token"]},
+    )
+
+    assert response_replay.status_code == HTTPStatus.UNAUTHORIZED
+
+    with local_session_maker() as db:
+        assert db.scalars(select(RefreshTokenModel.id).filter_by(revoked=False)).all() == []
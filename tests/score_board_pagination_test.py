@@ -0,0 +1,258 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+from starlette.testclient import TestClient
+
+from testing.util import (
+    UserData,
+    get_random_string,
+    get_resources_path,
+    patch_score_bets,
+)
+from yak_server.cli.admin import create_admin
+from yak_server.cli.database import initialize_database
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+    from yak_server.helpers.rules import Rules
+
+
+def test_score_board_pagination(
+    app_and_rules_for_compute_points: tuple["FastAPI", "Rules"],
+    engine_for_test: "Engine",
+    signup_token: str,
+) -> None:
+    app, _ = app_and_rules_for_compute_points
+
+    client = TestClient(app)
+
+    initialize_database(engine_for_test, get_resources_path("test_compute_points_v1"))
+
+    password = get_random_string(15)
+
+    create_admin(password, engine_for_test)
+
+    response_login_admin = client.post(
+        "/api/v1/users/login",
+        json={"name": "admin", "password": password},
+    )
+
+    assert response_login_admin.status_code == HTTPStatus.CREATED
+
+    admin_access_token = response_login_admin.json()["result"]["access_token"]
+
+    patch_score_bets(client, admin_access_token, [(1, 2), (5, 1), (5, 5)])
+
+    users_data = [
+        UserData(
+            first_name=get_random_string(15),
+            last_name=get_random_string(15),
+            name="user1",
+            scores=[(1, 2), (5, 1), (5, 5)],
+        ),
+        UserData(
+            first_name=get_random_string(15),
+            last_name=get_random_string(15),
+            name="user2",
+            scores=[(1, 2), (5, 1), (1, 4)],
+        ),
+        UserData(
+            first_name=get_random_string(15),
+            last_name=get_random_string(15),
+            name="user3",
+            scores=[(0, 2), (2, 0), (1, 4)],
+        ),
+    ]
+
+    for user_data in users_data:
+        response_signup = client.post(
+            "/api/v1/users/signup",
+            json={
+                "name": user_data.name,
+                "first_name": user_data.first_name,
+                "last_name": user_data.last_name,
+                "password": get_random_string(18),
+                "signup_token": signup_token,
+            },
+        )
+
+        assert response_signup.status_code == HTTPStatus.CREATED
+
+        user_data.access_token = response_signup.json()["result"]["access_token"]
+
+        patch_score_bets(client, user_data.access_token, user_data.scores)
+
+    response_compute_points = client.post(
+        "/api/v1/rules/62d46542-8cf1-4a3b-af77-a5086f10ac59",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+    )
+
+    assert response_compute_points.status_code == HTTPStatus.OK
+
+    # Success case : first page
+    response_first_page = client.get(
+        "/api/v1/score_board",
+        params={"limit": 2},
+        headers={"Authorization": f"Bearer {users_data[0].access_token}"},
+    )
+
+    assert response_first_page.status_code == HTTPStatus.OK
+    assert [
+        (result["rank"], result["first_name"])
+        for result in response_first_page.json()["result"]["results"]
+    ] == [(1, users_data[0].first_name), (2, users_data[1].first_name)]
+    assert response_first_page.json()["result"]["next_cursor"] is not None
+
+    # Success case : last page
+    response_last_page = client.get(
+        "/api/v1/score_board",
+        params={"limit": 2, "cursor": response_first_page.json()["result"]["next_cursor"]},
+        headers={"Authorization": f"Bearer {users_data[0].access_token}"},
+    )
+
+    assert response_last_page.status_code == HTTPStatus.OK
+    assert [
+        (result["rank"], result["first_name"])
+        for result in response_last_page.json()["result"]["results"]
+    ] == [(3, users_data[2].first_name)]
+    assert response_last_page.json()["result"]["next_cursor"] is None
+
+    # Success case : players around the current user
+    response_around_first = client.get(
+        "/api/v1/score_board",
+        params={"around": 1},
+        headers={"Authorization": f"Bearer {users_data[0].access_token}"},
+    )
+
+    assert response_around_first.status_code == HTTPStatus.OK
+    assert [result["rank"] for result in response_around_first.json()["result"]["results"]] == [
+        1,
+        2,
+    ]
+
+    response_around_second = client.get(
+        "/api/v1/score_board",
+        params={"around": 1},
+        headers={"Authorization": f"Bearer {users_data[1].access_token}"},
+    )
+
+    assert response_around_second.status_code == HTTPStatus.OK
+    assert [result["rank"] for result in response_around_second.json()["result"]["results"]] == [
+        1,
+        2,
+        3,
+    ]
+
+    # Admin is not ranked
+    response_around_admin = client.get(
+        "/api/v1/score_board",
+        params={"around": 1},
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+    )
+
+    assert response_around_admin.status_code == HTTPStatus.OK
+    assert response_around_admin.json()["result"]["results"] == []
+
+    # Success case : a player signing up later is ranked last, other ranks are kept
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": "user4",
+            "first_name": get_random_string(15),
+            "last_name": get_random_string(15),
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    late_access_token = response_signup.json()["result"]["access_token"]
+
+    response_score_board = client.get(
+        "/api/v1/score_board",
+        headers={"Authorization": f"Bearer {late_access_token}"},
+    )
+
+    assert response_score_board.status_code == HTTPStatus.OK
+    assert [
+        (result["rank"], result["first_name"])
+        for result in response_score_board.json()["result"]["results"]
+    ][:3] == [(rank, user_data.first_name) for rank, user_data in enumerate(users_data, 1)]
+    assert response_score_board.json()["result"]["results"][3]["rank"] == 4
+
+    response_results = client.get(
+        "/api/v1/results",
+        headers={"Authorization": f"Bearer {users_data[0].access_token}"},
+    )
+
+    assert response_results.status_code == HTTPStatus.OK
+    assert response_results.json()["result"]["number_of_players"] == 4
+
+    # Error case : invalid cursor
+    response_invalid_cursor = client.get(
+        "/api/v1/score_board",
+        params={"limit": 2, "cursor": "invalid"},
+        headers={"Authorization": f"Bearer {users_data[0].access_token}"},
+    )
+
+    assert response_invalid_cursor.status_code == HTTPStatus.BAD_REQUEST
+    assert response_invalid_cursor.json() == {
+        "ok": False,
+        "error_code": "invalid_cursor",
+        "description": "Invalid score board cursor",
+    }
+
+
+def test_score_board_new_player(
+    app_and_rules_for_compute_points: tuple["FastAPI", "Rules"],
+    engine_for_test: "Engine",
+    signup_token: str,
+) -> None:
+    app, _ = app_and_rules_for_compute_points
+
+    client = TestClient(app)
+
+    initialize_database(engine_for_test, get_resources_path("test_compute_points_v1"))
+
+    access_tokens = []
+
+    # Points were never computed, players are still listed as they sign up
+    for name in ("user1", "user2"):
+        response_signup = client.post(
+            "/api/v1/users/signup",
+            json={
+                "name": name,
+                "first_name": name,
+                "last_name": get_random_string(15),
+                "password": get_random_string(18),
+                "signup_token": signup_token,
+            },
+        )
+
+        assert response_signup.status_code == HTTPStatus.CREATED
+
+        access_tokens.append(response_signup.json()["result"]["access_token"])
+
+    response_score_board = client.get(
+        "/api/v1/score_board",
+        headers={"Authorization": f"Bearer {access_tokens[0]}"},
+    )
+
+    assert response_score_board.status_code == HTTPStatus.OK
+    assert sorted(
+        (result["rank"], result["points"])
+        for result in response_score_board.json()["result"]["results"]
+    ) == [(1, 0), (2, 0)]
+
+    for access_token in access_tokens:
+        response_results = client.get(
+            "/api/v1/results",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+
+        assert response_results.status_code == HTTPStatus.OK
+        assert response_results.json()["result"]["rank"] > 0
+        assert response_results.json()["result"]["number_of_players"] == 2
@@ -0,0 +1,86 @@
+from typing import TYPE_CHECKING
+
+import pytest
+
+from testing.util import get_random_string, get_resources_path
+from yak_server.cli.database import initialize_database
+from yak_server.database.models import (
+    BetMapping,
+    BinaryBetModel,
+    GroupPositionModel,
+    MatchModel,
+    MatchReferenceModel,
+    Role,
+    ScoreBetModel,
+    UserKnockoutGuessModel,
+)
+from yak_server.database.session import build_local_session_maker
+from yak_server.helpers import authentication
+from yak_server.helpers.authentication import BracketMaterialization, SignupSettings, signup_user
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+    from yak_server.helpers.rules import Rules
+
+
+@pytest.mark.parametrize("bracket_materialization", list(BracketMaterialization))
+def test_signup_user_clones_reference_bracket(
+    app_and_rules_for_compute_points: tuple["FastAPI", "Rules"],
+    engine_for_test: "Engine",
+    monkeypatch: pytest.MonkeyPatch,
+    bracket_materialization: BracketMaterialization,
+) -> None:
+    _, rules = app_and_rules_for_compute_points
+
+    monkeypatch.setattr(
+        authentication,
+        "get_signup_settings",
+        lambda: SignupSettings(bracket_materialization=bracket_materialization),
+    )
+
+    initialize_database(engine_for_test, get_resources_path("test_compute_points_v1"))
+
+    local_session_maker = build_local_session_maker(engine_for_test)
+
+    with local_session_maker() as db:
+        user = signup_user(
+            db,
+            name=get_random_string(6),
+            first_name=get_random_string(6),
+            last_name=get_random_string(6),
+            password=get_random_string(15),
+            role=Role.USER,
+            rule_config=rules.compute_points,
+        )
+
+        match_references = db.query(MatchReferenceModel).all()
+        matches = db.query(MatchModel).filter_by(user_id=user.id).all()
+
+        assert sorted(
+            (match.group_id, match.index, match.team1_id, match.team2_id) for match in matches
+        ) == sorted(
+            (reference.group_id, reference.index, reference.team1_id, reference.team2_id)
+            for reference in match_references
+        )
+
+        score_bets = db.query(ScoreBetModel).join(ScoreBetModel.match).filter_by(user_id=user.id)
+        binary_bets = db.query(BinaryBetModel).join(BinaryBetModel.match).filter_by(user_id=user.id)
+
+        assert score_bets.count() == 3
+        assert binary_bets.count() == 1
+
+        group_positions = db.query(GroupPositionModel).filter_by(user_id=user.id).all()
+
+        assert {group_position.team_id for group_position in group_positions} == {
+            team_id
+            for reference in match_references
+            if reference.bet_type_from_match == BetMapping.SCORE_BET
+            for team_id in (reference.team1_id, reference.team2_id)
+        }
+        assert len(group_positions) == len({
+            group_position.team_id for group_position in group_positions
+        })
+
+        assert db.query(UserKnockoutGuessModel).filter_by(user_id=user.id).count() == 1
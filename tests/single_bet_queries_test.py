@@ -0,0 +1,80 @@
+from collections.abc import Generator
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from sqlalchemy import Engine, event
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string, get_resources_path
+from yak_server.cli.database import initialize_database
+from yak_server.helpers import version_counter
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+
+@pytest.fixture
+def statements() -> Generator[list[str], None, None]:
+    executed: list[str] = []
+
+    def record(*args: Any) -> None:  # ruff:ignore[any-type]
+        executed.append(args[2])
+
+    # Listening on the class catches every engine, including the sync side of async ones
+    event.listen(Engine, "before_cursor_execute", record)
+
+    yield executed
+
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize(
+    ("resources", "bet_type"),
+    [("test_modify_bet_v2", "score_bets"), ("test_binary_bet", "binary_bets")],
+)
+def test_single_bet_in_one_query(
+    app_with_valid_jwt_config: "FastAPI",
+    engine_for_test: Engine,
+    signup_token: str,
+    statements: list[str],
+    resources: str,
+    bet_type: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    initialize_database(engine_for_test, get_resources_path(resources))
+
+    # Shared versions are read by the first request only, the check interval never elapses
+    monkeypatch.setattr(version_counter, "monotonic", lambda: 0.0)
+
+    client = TestClient(app_with_valid_jwt_config)
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(10),
+            "first_name": get_random_string(5),
+            "last_name": get_random_string(8),
+            "password": get_random_string(15),
+            "signup_token": signup_token,
+        },
+    )
+
+    assert response_signup.status_code == HTTPStatus.CREATED
+
+    headers = {"Authorization": f"Bearer {response_signup.json()['result']['access_token']}"}
+
+    response_bets = client.get("/api/v1/bets", headers=headers)
+
+    assert response_bets.status_code == HTTPStatus.OK
+
+    bet_id = response_bets.json()["result"][bet_type][0]["id"]
+
+    # User and reference data are cached by now, only the bet itself is queried
+    statements.clear()
+
+    response = client.get(f"/api/v1/{bet_type}/{bet_id}", headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["result"]["group"]["code"]
+    assert len(statements) == 1
@@ -0,0 +1,53 @@
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import jwt
+import pytest
+
+from testing.util import get_random_string
+from yak_server.helpers import token_cache
+from yak_server.helpers.authentication import decode_bearer_token
+from yak_server.helpers.token_cache import decode_bearer_token_cached, get_token_cache
+
+
+@pytest.fixture
+def decode_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    get_token_cache().clear()
+
+    calls: list[str] = []
+
+    def counting_decode(token: str, secret_key: str) -> Any:  # ruff:ignore[any-type]
+        calls.append(token)
+        return decode_bearer_token(token, secret_key)
+
+    monkeypatch.setattr(token_cache, "decode_bearer_token", counting_decode)
+
+    return calls
+
+
+def test_decode_bearer_token_cached(
+    decode_calls: list[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    secret_key = get_random_string(80)
+    expires_at = datetime.now(UTC) + timedelta(minutes=1)
+
+    token = jwt.encode({"sub": "user", "exp": expires_at}, secret_key, algorithm="HS512")
+
+    # Success case : repeat token is only verified once
+    for _ in range(3):
+        assert decode_bearer_token_cached(token, secret_key)["sub"] == "user"
+
+    assert len(decode_calls) == 1
+
+    # Error case : cached claims are not served for another secret
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode_bearer_token_cached(token, get_random_string(80))
+
+    assert len(decode_calls) == 2
+
+    # Cached claims are not served past the token expiration, token is verified again
+    monkeypatch.setattr(token_cache, "time", lambda: expires_at.timestamp() + 1)
+
+    decode_bearer_token_cached(token, secret_key)
+
+    assert len(decode_calls) == 3
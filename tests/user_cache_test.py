@@ -0,0 +1,231 @@
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Pool, event
+from starlette.testclient import TestClient
+
+from testing.util import get_random_string, get_resources_path
+from yak_server.cli.admin import create_admin
+from yak_server.cli.database import initialize_database
+from yak_server.database.models import UserModel
+from yak_server.database.session import build_local_session_maker
+from yak_server.helpers import ttl_cache, version_counter
+from yak_server.helpers.ttl_cache import TTLCache
+from yak_server.helpers.user_cache import get_user_cache
+from yak_server.helpers.version_counter import (
+    USERS_VERSION,
+    bump_version,
+    get_shared_versions,
+    get_version,
+    set_version,
+    user_version,
+)
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+    from sqlalchemy import Engine
+
+
+def test_ttl_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 0.0
+    monkeypatch.setattr(ttl_cache, "monotonic", lambda: now)
+
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    # Least recently used entry is evicted once full
+    cache.set("c", 3)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    # Entries expire after the ttl, or earlier when asked to
+    cache.set("a", 1, ttl=5)
+
+    now = 5.0
+
+    assert (cache.get("a"), cache.get("c")) == (None, 3)
+
+    now = 10.0
+
+    assert cache.get("c") is None
+    assert len(cache) == 0
+
+
+def test_user_cache_invalidation(
+    app_with_valid_jwt_config: "FastAPI",
+    engine_for_test: "Engine",
+    signup_token: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    client = TestClient(app_with_valid_jwt_config)
+
+    password = get_random_string(9)
+
+    create_admin(password, engine_for_test)
+
+    response_login_admin = client.post(
+        "/api/v1/users/login",
+        json={"name": "admin", "password": password},
+    )
+
+    admin_access_token = response_login_admin.json()["result"]["access_token"]
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(6),
+            "first_name": "Guillaume",
+            "last_name": "Le Pape",
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    user_id = response_signup.json()["result"]["id"]
+    access_token = response_signup.json()["result"]["access_token"]
+
+    response_current = client.get(
+        "/api/v1/users/current",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response_current.status_code == HTTPStatus.OK
+
+    local_session_maker = build_local_session_maker(engine_for_test)
+
+    with local_session_maker() as db:
+        users_version = get_version(db, USERS_VERSION)
+
+    cached_user = get_user_cache().get(UUID(user_id))
+
+    assert cached_user is not None
+    assert (cached_user.full_name, cached_user.token_version) == ("Guillaume Le Pape", 0)
+
+    # Password change drops the cached user
+    response_modify_password = client.patch(
+        f"/api/v1/users/{user_id}",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+        json={"password": get_random_string(15)},
+    )
+
+    assert response_modify_password.status_code == HTTPStatus.OK
+    assert get_user_cache().get(UUID(user_id)) is None
+
+    with local_session_maker() as db:
+        assert get_version(db, USERS_VERSION) > users_version
+
+    # Error case : token issued before the password change is rejected right away
+    response_current = client.get(
+        "/api/v1/users/current",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+    assert response_current.status_code == HTTPStatus.UNAUTHORIZED
+    assert response_current.json()["error_code"] == "invalid_token"
+
+    response_login = client.post(
+        "/api/v1/users/login",
+        json={"name": "admin", "password": password},
+    )
+
+    admin_id = UUID(response_login.json()["result"]["id"])
+    admin_access_token = response_login.json()["result"]["access_token"]
+
+    response_current = client.get(
+        "/api/v1/users/current",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+    )
+
+    assert response_current.status_code == HTTPStatus.OK
+
+    now = 0.0
+    monkeypatch.setattr(version_counter, "monotonic", lambda: now)
+    get_shared_versions().expire()
+
+    # Shared versions are read at now = 0, later requests within the interval do not read them
+    client.get("/api/v1/users/current", headers={"Authorization": f"Bearer {admin_access_token}"})
+    client.get("/api/v1/users/current", headers={"Authorization": f"Bearer {access_token}"})
+
+    assert get_user_cache().get(UUID(user_id)) is not None
+
+    # Change made by another process, this worker's cache is not touched
+    with local_session_maker() as db:
+        db.query(UserModel).filter_by(id=admin_id).update({
+            "token_version": UserModel.token_version + 1
+        })
+        set_version(db, user_version(admin_id), bump_version(db, USERS_VERSION))
+        db.commit()
+
+    # Success case : cached admin is trusted until the check interval elapses
+    response_current = client.get(
+        "/api/v1/users/current",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+    )
+
+    assert response_current.status_code == HTTPStatus.OK
+
+    now = 60.0
+
+    # Error case : admin is dropped once the versions are read again, other users are kept
+    response_current = client.get(
+        "/api/v1/users/current",
+        headers={"Authorization": f"Bearer {admin_access_token}"},
+    )
+
+    assert response_current.status_code == HTTPStatus.UNAUTHORIZED
+    assert response_current.json()["error_code"] == "invalid_token"
+    assert get_user_cache().get(UUID(user_id)) is not None
+
+
+def test_cached_user_needs_no_connection(
+    app_with_valid_jwt_config: "FastAPI",
+    engine_for_test: "Engine",
+    signup_token: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    initialize_database(engine_for_test, get_resources_path("test_matches_db"))
+
+    monkeypatch.setattr(version_counter, "monotonic", lambda: 0.0)
+    get_shared_versions().expire()
+
+    client = TestClient(app_with_valid_jwt_config)
+
+    response_signup = client.post(
+        "/api/v1/users/signup",
+        json={
+            "name": get_random_string(6),
+            "first_name": get_random_string(5),
+            "last_name": get_random_string(8),
+            "password": get_random_string(18),
+            "signup_token": signup_token,
+        },
+    )
+
+    headers = {"Authorization": f"Bearer {response_signup.json()['result']['access_token']}"}
+
+    # Caches the user and the reference data
+    assert client.get("/api/v1/phases", headers=headers).status_code == HTTPStatus.OK
+
+    checkouts: list[object] = []
+
+    def record(*args: object) -> None:
+        checkouts.append(args[0])
+
+    # Listening on the class catches every pool, including the async ones
+    event.listen(Pool, "checkout", record)
+
+    try:
+        response_current = client.get("/api/v1/users/current", headers=headers)
+        response_phases = client.get("/api/v1/phases", headers=headers)
+    finally:
+        event.remove(Pool, "checkout", record)
+
+    assert response_current.status_code == HTTPStatus.OK
+    assert response_phases.status_code == HTTPStatus.OK
+    assert checkouts == []
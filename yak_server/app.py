@@ -1,3 +1,7 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from importlib.metadata import version
 
 from fastapi import Depends, FastAPI
@@ -8,6 +12,7 @@ from yak_server.v1.helpers.rate_limiting import global_rate_limit, limiter
 
 from . import health_check
 from .helpers.logging_helpers import setup_logging
+from .helpers.refresh_tokens import RefreshTokenPruningSettings, prune_refresh_tokens_periodically
 from .helpers.settings import CookieSettings
 from .v1.helpers.errors import set_exception_handler
 from .v1.routers import bets as bets_router
@@ -32,6 +37,27 @@ class Config(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="allow")
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    pruning_settings = RefreshTokenPruningSettings()
+
+    if pruning_settings.interval == 0:
+        yield
+        return
+
+    pruning_task = asyncio.create_task(
+        prune_refresh_tokens_periodically(pruning_settings.interval, pruning_settings.batch_size),
+    )
+
+    try:
+        yield
+    finally:
+        pruning_task.cancel()
+
+        with contextlib.suppress(asyncio.CancelledError):
+            await pruning_task
+
+
 def create_app() -> FastAPI:
     # Initialize fastapi application
     config = Config()
@@ -45,6 +71,7 @@ def create_app() -> FastAPI:
         title="Yak API",
         description="Yak API",
         dependencies=[Depends(global_rate_limit)],
+        lifespan=lifespan,
     )
 
     app.state.limiter = limiter
@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 from uuid import UUID
 
+from sqlalchemy import update
 from sqlalchemy.dialects.postgresql import insert
 
 from yak_server.database.models import (
@@ -17,8 +18,12 @@ from yak_server.database.models import (
     ScoreBetModel,
     TeamModel,
     UserModel,
+    VersionCounterModel,
 )
 from yak_server.database.session import build_local_session_maker
+from yak_server.helpers.reference_data import invalidate_reference_data, reload_reference_data
+from yak_server.helpers.user_cache import clear_user_cache, invalidate_cached_user
+from yak_server.helpers.version_counter import SCORED_PLAYERS
 
 if TYPE_CHECKING:
     from sqlalchemy import Engine
@@ -165,8 +170,13 @@ def initialize_database(engine: "Engine", data_folder: Path) -> None:
 
         db.flush()
 
+        invalidate_reference_data(db)
+
         db.commit()
 
+    reload_reference_data()
+    clear_user_cache()
+
 
 def delete_database(engine: "Engine", *, debug: bool) -> None:
     if debug is False:
@@ -185,11 +195,23 @@ def delete_database(engine: "Engine", *, debug: bool) -> None:
         db.query(GroupModel).delete()
         db.query(PhaseModel).delete()
         db.query(TeamModel).delete()
+        db.query(VersionCounterModel).filter_by(name=SCORED_PLAYERS).delete()
+        # Counters only move forward, a reset would let workers trust their cached
+        # users and ETags from before the deletion
+        db.execute(update(VersionCounterModel).values(value=VersionCounterModel.value + 1))
+        invalidate_cached_user(db, None)
+        invalidate_reference_data(db)
         db.commit()
 
+    reload_reference_data()
+    clear_user_cache()
+
 
 def drop_database(engine: "Engine", *, debug: bool) -> None:
     if debug is False:
         raise TableDropInProductionError
 
     Base.metadata.drop_all(bind=engine)
+
+    reload_reference_data()
+    clear_user_cache()
@@ -11,6 +11,7 @@ from .admin import create_admin
 from .database import create_database, delete_database, drop_database, initialize_database
 from .env import init_env, write_app_env_file, write_db_env_file
 from .migration import setup_migration
+from .refresh_tokens import prune_tokens as prune_refresh_tokens
 from .score_board import compute_score_board
 
 
@@ -77,6 +78,20 @@ def make_db_app() -> click.Group:
         settings = get_settings()
         compute_score_board(engine, load_rules(settings.data_folder))
 
+    @db_app.command()
+    @click.option(
+        "-b",
+        "--batch-size",
+        default=1000,
+        show_default=True,
+        help="Number of tokens deleted per transaction",
+    )
+    def prune_tokens(batch_size: int) -> None:
+        """Delete expired refresh tokens."""
+        engine = build_engine()
+        deleted = prune_refresh_tokens(engine, batch_size)
+        click.echo(f"{deleted} refresh tokens deleted")
+
     return db_app
 
 
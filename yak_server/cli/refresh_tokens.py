@@ -0,0 +1,14 @@
+from typing import TYPE_CHECKING
+
+from yak_server.database.session import build_local_session_maker
+from yak_server.helpers.refresh_tokens import prune_refresh_tokens
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+
+def prune_tokens(engine: "Engine", batch_size: int) -> int:
+    local_session_maker = build_local_session_maker(engine)
+
+    with local_session_maker() as db:
+        return prune_refresh_tokens(db, batch_size)
@@ -0,0 +1,57 @@
+"""Backfill leaderboard.
+
+Revision ID: aa988f898836
+Revises: c02b1a6cc179
+Create Date: 2026-10-17 23:38:51.274432
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "aa988f898836"
+down_revision = "c02b1a6cc179"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Same rows as refresh_leaderboard, so the score board is not empty until
+    # points are computed again. Skipped if the leaderboard was already built.
+    op.execute(
+        """
+        INSERT INTO leaderboard (user_id, rank, points, number_of_players, knockout_rounds)
+        SELECT
+            "user".id,
+            row_number() OVER (ORDER BY "user".points DESC, "user".id),
+            "user".points,
+            count(*) OVER (),
+            coalesce(knockout_rounds.knockout_rounds, '[]'::jsonb)
+        FROM "user"
+        LEFT OUTER JOIN (
+            SELECT
+                user_knockout_guess.user_id,
+                jsonb_agg(
+                    jsonb_build_object(
+                        'group_id', user_knockout_guess.group_id,
+                        'count', user_knockout_guess.count
+                    )
+                    ORDER BY "group".index
+                ) AS knockout_rounds
+            FROM user_knockout_guess
+            JOIN "group" ON "group".id = user_knockout_guess.group_id
+            GROUP BY user_knockout_guess.user_id
+        ) AS knockout_rounds ON knockout_rounds.user_id = "user".id
+        WHERE "user".role != 'ADMIN' AND NOT EXISTS (SELECT 1 FROM leaderboard)
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO version_counter (name, value) VALUES ('score_board', 1)
+        ON CONFLICT (name) DO UPDATE SET value = version_counter.value + 1
+        """
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM leaderboard")
@@ -0,0 +1,27 @@
+"""Drop leaderboard number of players.
+
+Revision ID: c04c58f7b89d
+Revises: aa988f898836
+Create Date: 2026-10-18 00:07:30.427950
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c04c58f7b89d"
+down_revision = "aa988f898836"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Player count is read from the highest rank, so a signup only inserts its own row
+    op.drop_column("leaderboard", "number_of_players")
+
+
+def downgrade():
+    op.add_column("leaderboard", sa.Column("number_of_players", sa.Integer(), nullable=True))
+    op.execute("UPDATE leaderboard SET number_of_players = (SELECT count(*) FROM leaderboard)")
+    op.alter_column("leaderboard", "number_of_players", nullable=False)
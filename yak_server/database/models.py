@@ -1,23 +1,23 @@
 import contextlib
 from datetime import UTC, datetime
 from enum import Enum
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 from uuid import UUID, uuid4
 
 import sqlalchemy as sa
-from argon2 import PasswordHasher
 from argon2.exceptions import VerificationError
 from sqlalchemy import CheckConstraint, UniqueConstraint
 from sqlalchemy import Enum as SqlEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as DB_UUID
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from yak_server.helpers.password_hasher import get_password_hasher
+
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
-ph = PasswordHasher()
-
 
 class Base(DeclarativeBase):
     pass
@@ -74,6 +74,9 @@ class UserModel(Base):
         default=0,
     )
 
+    # Embedded in access tokens, bumped to invalidate the ones already issued
+    token_version: Mapped[int] = mapped_column(sa.Integer, nullable=False, default=0)
+
     matches: Mapped[list["MatchModel"]] = relationship(
         "MatchModel",
         back_populates="user",
@@ -101,7 +104,7 @@ class UserModel(Base):
         self.name = name
         self.first_name = first_name
         self.last_name = last_name
-        self.password = ph.hash(password)
+        self.password = get_password_hasher().hash(password)
         self.role = role
 
     @hybrid_property
@@ -115,20 +118,21 @@ class UserModel(Base):
         # user not found, verify password with itself to avoid timing attack
         if user is None:
             with contextlib.suppress(VerificationError):
-                ph.verify(ph.hash(password), password)
+                get_password_hasher().verify_dummy(password)
 
             return None
 
         # user found
         try:
-            ph.verify(user.password, password)
+            get_password_hasher().verify(user.password, password)
         except VerificationError:
             return None
 
         return user
 
     def change_password(self, new_password: str) -> None:
-        self.password = ph.hash(new_password)
+        self.password = get_password_hasher().hash(new_password)
+        self.token_version += 1
 
 
 class RefreshTokenModel(Base):
@@ -147,8 +151,15 @@ class RefreshTokenModel(Base):
         nullable=False,
         default=lambda: datetime.now(UTC),
     )
+    expires_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
     user: Mapped["UserModel"] = relationship("UserModel", foreign_keys=user_id, lazy="raise")
 
+    __table_args__ = (sa.Index("ix_refresh_token_user_id_revoked", "user_id", "revoked"),)
+
 
 class ScoreBetModel(Base):
     __tablename__ = "score_bet"
@@ -159,6 +170,7 @@ class ScoreBetModel(Base):
         DB_UUID(),
         sa.ForeignKey("match.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     match: Mapped["MatchModel"] = relationship(
         "MatchModel",
@@ -216,6 +228,7 @@ class BinaryBetModel(Base):
         DB_UUID(),
         sa.ForeignKey("match.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     match: Mapped["MatchModel"] = relationship(
         "MatchModel",
@@ -311,6 +324,8 @@ class MatchModel(Base):
         passive_deletes=True,
     )
 
+    __table_args__ = (sa.Index("ix_match_user_id_group_id_index", "user_id", "group_id", "index"),)
+
 
 class TeamModel(Base):
     __tablename__ = "team"
@@ -405,6 +420,11 @@ class GroupPositionModel(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        sa.Index("ix_group_position_user_id_group_id", "user_id", "group_id"),
+        sa.Index("ix_group_position_user_id_team_id", "user_id", "team_id"),
+    )
+
     @hybrid_property
     def played(self) -> int:
         return self.won + self.drawn + self.lost
@@ -448,3 +468,75 @@ class UserKnockoutGuessModel(Base):
     )
 
     __table_args__ = (UniqueConstraint("user_id", "group_id", name="uq_user_knockout_guess"),)
+
+
+class UserMatchPointsModel(Base):
+    __tablename__ = "user_match_points"
+    id: Mapped[UUID] = mapped_column(DB_UUID(), primary_key=True, nullable=False, default=uuid4)
+
+    user_id: Mapped[UUID] = mapped_column(
+        DB_UUID(),
+        sa.ForeignKey("user.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    group_id: Mapped[UUID] = mapped_column(
+        DB_UUID(),
+        sa.ForeignKey("group.id"),
+        nullable=False,
+    )
+
+    index: Mapped[int] = mapped_column(sa.Integer, nullable=False)
+
+    number_match_guess: Mapped[int] = mapped_column(
+        sa.Integer,
+        CheckConstraint("number_match_guess>=0"),
+        nullable=False,
+        default=0,
+    )
+    number_score_guess: Mapped[int] = mapped_column(
+        sa.Integer,
+        CheckConstraint("number_score_guess>=0"),
+        nullable=False,
+        default=0,
+    )
+    points: Mapped[float] = mapped_column(
+        sa.Float,
+        CheckConstraint("points>=0"),
+        nullable=False,
+        default=0,
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "group_id", "index", name="uq_user_match_points"),
+    )
+
+
+class LeaderboardModel(Base):
+    __tablename__ = "leaderboard"
+
+    user_id: Mapped[UUID] = mapped_column(
+        DB_UUID(),
+        sa.ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
+    )
+    user: Mapped["UserModel"] = relationship("UserModel", lazy="raise")
+
+    rank: Mapped[int] = mapped_column(
+        sa.Integer,
+        CheckConstraint("rank>0"),
+        nullable=False,
+        index=True,
+    )
+    points: Mapped[float] = mapped_column(sa.Float, nullable=False)
+    knockout_rounds: Mapped[list[dict[str, Any]]] = mapped_column(JSONB, nullable=False)
+
+    __table_args__ = (sa.Index("ix_leaderboard_points_user_id", sa.desc("points"), "user_id"),)
+
+
+class VersionCounterModel(Base):
+    __tablename__ = "version_counter"
+
+    name: Mapped[str] = mapped_column(sa.String(100), primary_key=True, nullable=False)
+    value: Mapped[int] = mapped_column(sa.BigInteger, nullable=False, default=0)
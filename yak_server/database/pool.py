@@ -0,0 +1,116 @@
+import logging
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+from typing import ClassVar
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class PoolMetrics:
+    name: str
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    peak_checked_out: int
+    peak_overflow: int
+
+
+class PoolStats:
+    """Counters of one connection pool, for the current worker process.
+
+    Wait time covers the whole checkout: waiting for a free slot, opening a
+    new connection when the pool grows, and the pre-ping if enabled.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._lock = Lock()
+        self._pool: QueuePool | None = None
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._peak_checked_out = 0
+        self._peak_overflow = 0
+
+    def record_checkout(self, pool: QueuePool, wait: float) -> None:
+        with self._lock:
+            self._pool = pool
+            self._checkouts += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            self._peak_checked_out = max(self._peak_checked_out, pool.checkedout())
+            self._peak_overflow = max(self._peak_overflow, pool.overflow())
+
+    def record_timeout(self, pool: QueuePool, wait: float) -> None:
+        with self._lock:
+            self._pool = pool
+            self._timeouts += 1
+            self._wait_max = max(self._wait_max, wait)
+
+        logger.warning(
+            f"Connection pool {self._name} timed out after {wait:.1f}s:"
+            f" {pool.checkedout()} checked out, overflow {pool.overflow()},"
+            f" {self._timeouts} timeouts so far",
+        )
+
+    def metrics(self) -> PoolMetrics:
+        with self._lock:
+            pool = self._pool
+
+            return PoolMetrics(
+                name=self._name,
+                size=pool.size() if pool is not None else 0,
+                checked_out=pool.checkedout() if pool is not None else 0,
+                overflow=max(pool.overflow(), 0) if pool is not None else 0,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                wait_avg_ms=self._wait_total / self._checkouts * 1000 if self._checkouts else 0,
+                wait_max_ms=self._wait_max * 1000,
+                peak_checked_out=self._peak_checked_out,
+                peak_overflow=max(self._peak_overflow, 0),
+            )
+
+
+class InstrumentedQueuePool(QueuePool):
+    # Stats are held by the class, so they survive the pool being recreated on dispose
+    stats: ClassVar[PoolStats] = PoolStats("sync")
+
+    def connect(self) -> PoolProxiedConnection:
+        start = perf_counter()
+
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.stats.record_timeout(self, perf_counter() - start)
+            raise
+
+        self.stats.record_checkout(self, perf_counter() - start)
+
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    stats: ClassVar[PoolStats] = PoolStats("async")
+
+
+class InstrumentedAsyncReplicaQueuePool(InstrumentedAsyncQueuePool):
+    stats: ClassVar[PoolStats] = PoolStats("async_read_replica")
+
+
+def pool_metrics() -> list[PoolMetrics]:
+    return [
+        InstrumentedQueuePool.stats.metrics(),
+        InstrumentedAsyncQueuePool.stats.metrics(),
+        InstrumentedAsyncReplicaQueuePool.stats.metrics(),
+    ]
@@ -1,32 +1,25 @@
-from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
-from pydantic import UUID4
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, StatementLambdaElement, lambda_stmt, select
+from sqlalchemy.orm import contains_eager, selectinload
 
-from .models import BinaryBetModel, GroupModel, MatchModel, PhaseModel, ScoreBetModel
+from .models import BinaryBetModel, GroupModel, MatchModel, ScoreBetModel
 
 if TYPE_CHECKING:
-    from sqlalchemy.orm import Session
-
-    from .models import UserModel
+    from uuid import UUID
 
+    from yak_server.helpers.authentication import Principal
+    from yak_server.helpers.reference_data import Group, Phase
 
-def bets_from_group_id(
-    db: "Session",
-    user: "UserModel",
-    group_id: UUID4,
-) -> tuple[GroupModel | None, Iterable[ScoreBetModel], Iterable[BinaryBetModel]]:
-    group = (
-        db.query(GroupModel).options(selectinload(GroupModel.phase)).filter_by(id=group_id).first()
-    )
+    from .models import UserModel
 
-    if group is None:
-        return None, [], []
 
+def bets_from_group(
+    user: "UserModel | Principal",
+    group: "Group",
+) -> tuple[Select[tuple[ScoreBetModel]], Select[tuple[BinaryBetModel]]]:
     score_bets = (
-        db
-        .query(ScoreBetModel)
+        select(ScoreBetModel)
         .options(
             selectinload(ScoreBetModel.match).selectinload(MatchModel.team1),
             selectinload(ScoreBetModel.match).selectinload(MatchModel.team2),
@@ -37,8 +30,7 @@ def bets_from_group_id(
     )
 
     binary_bets = (
-        db
-        .query(BinaryBetModel)
+        select(BinaryBetModel)
         .options(
             selectinload(BinaryBetModel.match).selectinload(MatchModel.team1),
             selectinload(BinaryBetModel.match).selectinload(MatchModel.team2),
@@ -48,29 +40,15 @@ def bets_from_group_id(
         .order_by(MatchModel.index)
     )
 
-    return group, score_bets, binary_bets
-
+    return score_bets, binary_bets
 
-def bets_from_phase_code(
-    db: "Session",
-    user: "UserModel",
-    phase_code: str,
-) -> tuple[
-    PhaseModel | None,
-    Iterable[GroupModel],
-    Iterable[ScoreBetModel],
-    Iterable[BinaryBetModel],
-]:
-    phase = db.query(PhaseModel).filter_by(code=phase_code).first()
-
-    if not phase:
-        return None, [], [], []
-
-    groups = db.query(GroupModel).filter_by(phase_id=phase.id).order_by(GroupModel.index)
 
+def bets_from_phase(
+    user: "UserModel | Principal",
+    phase: "Phase",
+) -> tuple[Select[tuple[ScoreBetModel]], Select[tuple[BinaryBetModel]]]:
     binary_bets = (
-        db
-        .query(BinaryBetModel)
+        select(BinaryBetModel)
         .options(
             selectinload(BinaryBetModel.match).selectinload(MatchModel.team1),
             selectinload(BinaryBetModel.match).selectinload(MatchModel.team2),
@@ -82,8 +60,7 @@ def bets_from_phase_code(
     )
 
     score_bets = (
-        db
-        .query(ScoreBetModel)
+        select(ScoreBetModel)
         .options(
             selectinload(ScoreBetModel.match).selectinload(MatchModel.team1),
             selectinload(ScoreBetModel.match).selectinload(MatchModel.team2),
@@ -94,4 +71,44 @@ def bets_from_phase_code(
         .order_by(GroupModel.index, MatchModel.index)
     )
 
-    return phase, groups, score_bets, binary_bets
+    return score_bets, binary_bets
+
+
+# Single bet statements run on every bet read and write. As lambdas, they are
+# built and their cache key computed once, later calls only bind parameters.
+# The match comes from the join in one query, teams and groups are taken from
+# the reference data.
+
+
+def score_bet_from_id(user_id: "UUID", bet_id: "UUID") -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(ScoreBetModel)
+            .join(ScoreBetModel.match)
+            .options(contains_eager(ScoreBetModel.match))
+            .where(MatchModel.user_id == user_id, ScoreBetModel.id == bet_id)
+        ),
+    )
+
+
+def score_bets_to_modify(user_id: "UUID", bet_ids: list["UUID"]) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(ScoreBetModel)
+            .join(ScoreBetModel.match)
+            .options(contains_eager(ScoreBetModel.match))
+            .where(MatchModel.user_id == user_id, ScoreBetModel.id.in_(bet_ids))
+            .with_for_update()
+        ),
+    )
+
+
+def binary_bet_from_id(user_id: "UUID", bet_id: "UUID") -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: (
+            select(BinaryBetModel)
+            .join(BinaryBetModel.match)
+            .options(contains_eager(BinaryBetModel.match))
+            .where(MatchModel.user_id == user_id, BinaryBetModel.id == bet_id)
+        ),
+    )
@@ -1,8 +1,21 @@
+from typing import Any
+
 import psycopg
 from sqlalchemy import URL, Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
-from .settings import get_postgres_settings
+from .pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedAsyncReplicaQueuePool,
+    InstrumentedQueuePool,
+)
+from .settings import get_postgres_settings, get_read_replica_settings
 
 
 def compute_database_uri(
@@ -18,10 +31,10 @@ def compute_database_uri(
     )
 
 
-def build_engine() -> Engine:
+def _database_url() -> URL:
     postgres_settings = get_postgres_settings()
 
-    database_url = compute_database_uri(
+    return compute_database_uri(
         psycopg.__name__,
         postgres_settings.host,
         postgres_settings.user,
@@ -30,8 +43,57 @@ def build_engine() -> Engine:
         postgres_settings.db,
     )
 
-    return create_engine(database_url, pool_recycle=7200, pool_pre_ping=True)
+
+def _engine_options() -> dict[str, Any]:
+    postgres_settings = get_postgres_settings()
+
+    return {
+        "pool_size": postgres_settings.pool_size,
+        "max_overflow": postgres_settings.max_overflow,
+        "pool_timeout": postgres_settings.pool_timeout,
+        "pool_recycle": postgres_settings.pool_recycle,
+        "pool_pre_ping": postgres_settings.pool_pre_ping,
+        "connect_args": {"prepare_threshold": postgres_settings.prepare_threshold},
+    }
+
+
+def build_engine() -> Engine:
+    return create_engine(_database_url(), poolclass=InstrumentedQueuePool, **_engine_options())
+
+
+def build_async_engine() -> AsyncEngine:
+    # Same psycopg driver, SQLAlchemy picks its asyncio flavour
+    return create_async_engine(
+        _database_url(), poolclass=InstrumentedAsyncQueuePool, **_engine_options()
+    )
+
+
+def build_async_read_replica_engine() -> AsyncEngine | None:
+    replica_settings = get_read_replica_settings()
+
+    if replica_settings.host is None:
+        return None
+
+    postgres_settings = get_postgres_settings()
+
+    database_url = compute_database_uri(
+        psycopg.__name__,
+        replica_settings.host,
+        replica_settings.user or postgres_settings.user,
+        replica_settings.password or postgres_settings.password,
+        replica_settings.port or postgres_settings.port,
+        replica_settings.db or postgres_settings.db,
+    )
+
+    return create_async_engine(
+        database_url, poolclass=InstrumentedAsyncReplicaQueuePool, **_engine_options()
+    )
 
 
 def build_local_session_maker(engine: Engine) -> sessionmaker[Session]:
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def build_async_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    # Attributes cannot be lazy loaded in async code, keep them usable after a commit
+    return async_sessionmaker(autoflush=False, bind=engine, expire_on_commit=False)
@@ -1,5 +1,6 @@
 from functools import cache
 
+from pydantic import NonNegativeFloat, NonNegativeInt, PositiveFloat, PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,13 +11,48 @@ class PostgresSettings(BaseSettings):
     port: int
     db: str
 
+    # Per engine and per worker process, each worker holds a sync and an async engine
+    pool_size: PositiveInt = 5
+    max_overflow: NonNegativeInt = 10
+    pool_timeout: PositiveFloat = 30  # seconds
+    pool_recycle: int = 7200  # seconds, -1 disables it
+    pool_pre_ping: bool = True
+
+    # Executions of a query before psycopg prepares it server side, 0 prepares right away.
+    # Set to null to disable, e.g. behind pgbouncer in transaction pooling mode.
+    prepare_threshold: NonNegativeInt | None = 5
+
     model_config = SettingsConfigDict(
         env_file=".env.db",
         env_file_encoding="utf-8",
         env_prefix="postgres_",
+        env_parse_none_str="null",
+    )
+
+
+class ReadReplicaSettings(BaseSettings):
+    # Replica is disabled without host, other connection fields default to the primary ones
+    host: str | None = None
+    user: str | None = None
+    password: str | None = None
+    port: int | None = None
+    db: str | None = None
+
+    max_lag: NonNegativeFloat = 5  # seconds, reads go to the primary past it
+    lag_check_interval: PositiveFloat = 5  # seconds
+
+    model_config = SettingsConfigDict(
+        env_file=".env.db",
+        env_file_encoding="utf-8",
+        env_prefix="read_replica_",
     )
 
 
 @cache
 def get_postgres_settings() -> PostgresSettings:
     return PostgresSettings()
+
+
+@cache
+def get_read_replica_settings() -> ReadReplicaSettings:
+    return ReadReplicaSettings()
@@ -1,11 +1,15 @@
+import os
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from .database.pool import pool_metrics
 from .helpers.database import get_db
+from .helpers.password_hasher import get_password_hasher
 from .v1.models.generic import ErrorOut, GenericOut
+from .v1.models.health import PasswordHashingMetricsOut, PoolMetricsOut, PoolStatusResponse
 
 router = APIRouter(prefix="/health", tags=["health"])
 
@@ -19,3 +23,18 @@ def health_check(db: Annotated[Session, Depends(get_db)]) -> GenericOut[None]:
     db.execute(text("SELECT 1"))
 
     return GenericOut(ok=True, result=None)
+
+
+@router.get("/pool")
+async def pool_status() -> GenericOut[PoolStatusResponse]:
+    # No connection and no threadpool slot needed, still answers while the pool is exhausted.
+    # Counters are per worker process, each request may land on another worker.
+    return GenericOut(
+        result=PoolStatusResponse(
+            worker_pid=os.getpid(),
+            pools=[PoolMetricsOut.model_validate(metrics) for metrics in pool_metrics()],
+            password_hashing=PasswordHashingMetricsOut.model_validate(
+                get_password_hasher().metrics(),
+            ),
+        ),
+    )
@@ -1,13 +1,21 @@
+import logging
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from enum import Enum
-from typing import Any
+from functools import cache
+from typing import TYPE_CHECKING, Any
 from uuid import UUID, uuid4
 
 import jwt
-from sqlalchemy.orm import Session, selectinload
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import and_, func, insert, literal, select, union, update
+from sqlalchemy.orm import Session
 
 from yak_server.database.models import (
+    BetMapping,
+    BinaryBetModel,
     GroupModel,
+    GroupPositionModel,
     MatchModel,
     MatchReferenceModel,
     Role,
@@ -17,19 +25,55 @@ from yak_server.database.models import (
 )
 from yak_server.helpers.rules.compute_points import RuleComputePoints
 
+from .database import new_session
 from .errors import name_already_exists_message
 from .group_position import create_group_position
+from .leaderboard import add_to_leaderboard
+from .password_hasher import PasswordHashingBusyError, get_password_hasher
 from .password_validator import validate_password
 
+if TYPE_CHECKING:
+    from .user_cache import CachedUser
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Principal:
+    """Authenticated user as described by the access token claims.
+
+    require_permission still checks the claims against the cached user, so a
+    deleted user, a changed role or a changed password rejects the token on
+    every endpoint. Handlers then scope queries to the user without loading
+    the user row, which is only fetched by handlers that need more.
+    """
+
+    id: UUID
+    name: str
+    role: Role
+    token_version: int
+
+    @classmethod
+    def from_claims(cls, data: dict[str, Any]) -> "Principal":
+        return cls(
+            id=UUID(data["sub"]),
+            name=data["name"],
+            role=Role(data["role"]),
+            token_version=int(data["ver"]),
+        )
+
 
 def encode_bearer_token(
-    sub: UUID,
+    user: UserModel,
     expiration_time: timedelta,
     secret_key: str,
 ) -> str:
     return jwt.encode(
         {
-            "sub": str(sub),
+            "sub": str(user.id),
+            "name": user.name,
+            "role": user.role.value,
+            "ver": user.token_version,
             "nbf": datetime.now(UTC) - timedelta(seconds=3),
             "exp": datetime.now(UTC) + expiration_time,
         },
@@ -41,19 +85,21 @@ def encode_bearer_token(
 def encode_refresh_token(
     expiration_time: timedelta,
     secret_key: str,
-) -> tuple[str, UUID]:
+) -> tuple[str, UUID, datetime]:
     jti = uuid4()
+    expires_at = datetime.now(UTC) + expiration_time
     return (
         jwt.encode(
             {
                 "jti": str(jti),
                 "nbf": datetime.now(UTC) - timedelta(seconds=3),
-                "exp": datetime.now(UTC) + expiration_time,
+                "exp": expires_at,
             },
             secret_key,
             algorithm="HS512",
         ),
         jti,
+        expires_at,
     )
 
 
@@ -61,11 +107,170 @@ def decode_bearer_token(token: str, secret_key: str) -> Any:  # ruff:ignore[any-
     return jwt.decode(token, secret_key, algorithms=["HS512"])
 
 
+class BracketMaterialization(Enum):
+    CLONE = "clone"  # INSERT ... SELECT run by Postgres
+    BULK = "bulk"  # Rows built in memory, one insert per table
+
+
+class SignupSettings(BaseSettings):
+    bracket_materialization: BracketMaterialization = BracketMaterialization.CLONE
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="signup_",
+        extra="allow",
+    )
+
+
+@cache
+def get_signup_settings() -> SignupSettings:
+    return SignupSettings()
+
+
 class NameAlreadyExistsError(Exception):
     def __init__(self, name: str) -> None:
         super().__init__(name_already_exists_message(name))
 
 
+def clone_reference_bracket(
+    db: Session,
+    user: UserModel,
+    rule_config: RuleComputePoints | None,
+) -> None:
+    """Copy the match reference bracket to a new user with INSERT ... SELECT.
+
+    Ids are generated by Postgres so no per-row data goes through Python and
+    the number of statements does not depend on the competition size.
+    """
+    db.execute(
+        insert(MatchModel).from_select(
+            ["id", "team1_id", "team2_id", "index", "group_id", "user_id"],
+            select(
+                func.gen_random_uuid(),
+                MatchReferenceModel.team1_id,
+                MatchReferenceModel.team2_id,
+                MatchReferenceModel.index,
+                MatchReferenceModel.group_id,
+                literal(user.id),
+            ),
+        ),
+    )
+
+    for bet_model, bet_type in (
+        (ScoreBetModel, BetMapping.SCORE_BET),
+        (BinaryBetModel, BetMapping.BINARY_BET),
+    ):
+        db.execute(
+            insert(bet_model).from_select(
+                ["id", "match_id"],
+                select(func.gen_random_uuid(), MatchModel.id)
+                .join(
+                    MatchReferenceModel,
+                    and_(
+                        MatchReferenceModel.group_id == MatchModel.group_id,
+                        MatchReferenceModel.index == MatchModel.index,
+                    ),
+                )
+                .where(
+                    MatchModel.user_id == user.id,
+                    MatchReferenceModel.bet_type_from_match == bet_type,
+                ),
+            ),
+        )
+
+    # One group position per team playing a score bet match
+    teams = union(
+        *(
+            select(team_id.label("team_id"), MatchReferenceModel.group_id).where(
+                MatchReferenceModel.bet_type_from_match == BetMapping.SCORE_BET,
+                team_id.is_not(None),
+            )
+            for team_id in (MatchReferenceModel.team1_id, MatchReferenceModel.team2_id)
+        ),
+    ).subquery()
+
+    db.execute(
+        insert(GroupPositionModel).from_select(
+            ["id", "team_id", "user_id", "group_id"],
+            select(
+                func.gen_random_uuid(),
+                teams.c.team_id,
+                literal(user.id),
+                teams.c.group_id,
+            ).distinct(teams.c.team_id),
+        ),
+    )
+
+    if rule_config is not None and rule_config.knockout_rounds:
+        knockout_group_codes = {r.group_code for r in rule_config.knockout_rounds}
+
+        db.execute(
+            insert(UserKnockoutGuessModel).from_select(
+                ["id", "user_id", "group_id", "count"],
+                select(
+                    func.gen_random_uuid(),
+                    literal(user.id),
+                    GroupModel.id,
+                    literal(0),
+                ).where(GroupModel.code.in_(knockout_group_codes)),
+            ),
+        )
+
+
+def materialize_reference_bracket(
+    db: Session,
+    user: UserModel,
+    rule_config: RuleComputePoints | None,
+) -> None:
+    """Copy the match reference bracket to a new user with one bulk insert per table.
+
+    Rows are built in memory with client-generated ids, so matches, bets and
+    group positions are written without a flush per match nor reading back
+    the new score bets.
+    """
+    matches: list[dict[str, Any]] = []
+    score_bet_matches: list[dict[str, Any]] = []
+    bets: dict[BetMapping, list[dict[str, Any]]] = {bet_type: [] for bet_type in BetMapping}
+
+    for match_reference in db.query(MatchReferenceModel):
+        match = {
+            "id": uuid4(),
+            "team1_id": match_reference.team1_id,
+            "team2_id": match_reference.team2_id,
+            "index": match_reference.index,
+            "group_id": match_reference.group_id,
+            "user_id": user.id,
+        }
+        matches.append(match)
+
+        bets[match_reference.bet_type_from_match].append({"id": uuid4(), "match_id": match["id"]})
+
+        if match_reference.bet_type_from_match == BetMapping.SCORE_BET:
+            score_bet_matches.append(match)
+
+    group_positions = create_group_position(score_bet_matches)
+
+    knockout_guesses: list[dict[str, Any]] = []
+
+    if rule_config is not None and rule_config.knockout_rounds:
+        knockout_group_codes = {r.group_code for r in rule_config.knockout_rounds}
+        knockout_guesses = [
+            {"id": uuid4(), "user_id": user.id, "group_id": group.id, "count": 0}
+            for group in db.query(GroupModel).filter(GroupModel.code.in_(knockout_group_codes))
+        ]
+
+    for model, rows in (
+        (MatchModel, matches),
+        (ScoreBetModel, bets[BetMapping.SCORE_BET]),
+        (BinaryBetModel, bets[BetMapping.BINARY_BET]),
+        (GroupPositionModel, group_positions),
+        (UserKnockoutGuessModel, knockout_guesses),
+    ):
+        if rows:
+            db.execute(insert(model), rows)
+
+
 def signup_user(
     db: Session,
     name: str,
@@ -88,42 +293,40 @@ def signup_user(
     db.add(user)
     db.flush()
 
-    # Initialize matches and bets and integrate in db
-    for match_reference in db.query(MatchReferenceModel).all():
-        match = MatchModel(
-            team1_id=match_reference.team1_id,
-            team2_id=match_reference.team2_id,
-            index=match_reference.index,
-            group_id=match_reference.group_id,
-            user_id=user.id,
-        )
-        db.add(match)
-        db.flush()
-
-        db.add(match_reference.bet_type_from_match.value(match_id=match.id))
-        db.flush()
-
-    # Create group position records
-    db.add_all(
-        create_group_position(
-            db
-            .query(ScoreBetModel)
-            .options(selectinload(ScoreBetModel.match))
-            .join(ScoreBetModel.match)
-            .filter_by(user_id=user.id),
-        ),
-    )
+    if get_signup_settings().bracket_materialization == BracketMaterialization.BULK:
+        materialize_reference_bracket(db, user, rule_config)
+    else:
+        clone_reference_bracket(db, user, rule_config)
 
-    if rule_config is not None and rule_config.knockout_rounds:
-        knockout_group_codes = {r.group_code for r in rule_config.knockout_rounds}
-        for group in db.query(GroupModel).filter(GroupModel.code.in_(knockout_group_codes)):
-            db.add(UserKnockoutGuessModel(user_id=user.id, group_id=group.id, count=0))
+    # New player shows up on the score board and counts in everyone's results
+    if role != Role.ADMIN:
+        add_to_leaderboard(db, user)
 
     db.commit()
 
     return user
 
 
+def rehash_password(user_id: UUID, password_hash: str, password: str) -> None:
+    """Upgrade a stored hash to the current argon2 parameters, run after a login.
+
+    The update is skipped if the password changed in the meantime.
+    """
+    try:
+        new_password_hash = get_password_hasher().hash(password)
+    except PasswordHashingBusyError:
+        logger.info(f"Skip password rehash of user {user_id}, password hashing pool is busy")
+        return
+
+    with new_session() as db:
+        db.execute(
+            update(UserModel)
+            .where(UserModel.id == user_id, UserModel.password == password_hash)
+            .values(password=new_password_hash),
+        )
+        db.commit()
+
+
 class Permission(Enum):
     """Define different permission levels"""
 
@@ -131,7 +334,9 @@ class Permission(Enum):
     ADMIN = "admin"  # Administrative access
 
 
-def has_permission(user: UserModel, required_permission: Permission) -> bool:
+def has_permission(
+    user: "UserModel | Principal | CachedUser", required_permission: Permission
+) -> bool:
     """Check if user has the required permission level.
 
     Args:
@@ -1,9 +1,33 @@
-from collections.abc import Generator
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, Generator
 from functools import cache
+from time import monotonic
 
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker
 
-from yak_server.database.session import build_engine, build_local_session_maker
+from yak_server.database.session import (
+    build_async_engine,
+    build_async_read_replica_engine,
+    build_async_session_maker,
+    build_engine,
+    build_local_session_maker,
+)
+from yak_server.database.settings import get_read_replica_settings
+
+logger = logging.getLogger(__name__)
+
+# Zero on a primary, or on a replica which has replayed everything it received
+REPLICATION_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()"
+    " THEN 0"
+    " ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())"
+    " END",
+)
 
 
 @cache
@@ -12,8 +36,111 @@ def _get_sqlalchemy_session_maker() -> sessionmaker[Session]:
     return build_local_session_maker(engine)
 
 
+def new_session() -> Session:
+    # For work running outside of a request, e.g. background tasks
+    return _get_sqlalchemy_session_maker()()
+
+
 def get_db() -> Generator[Session, None, None]:
     local_session_maker = _get_sqlalchemy_session_maker()
 
     with local_session_maker() as db:
         yield db
+
+
+@cache
+def _get_async_session_maker() -> async_sessionmaker[AsyncSession]:
+    engine = build_async_engine()
+    return build_async_session_maker(engine)
+
+
+def new_async_session() -> AsyncSession:
+    # Connects on first query only, for lookups mostly served from a process cache
+    return _get_async_session_maker()()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    local_session_maker = _get_async_session_maker()
+
+    # FastAPI wraps yield dependencies in a context manager, cleanup does run
+    async with local_session_maker() as db:
+        yield db  # ruff:ignore[yield-in-context-manager-in-async-generator]
+
+
+class ReadReplica:
+    """Route reads to a replica while it is reachable and does not lag too much.
+
+    Lag is checked at most once per interval in each worker. Requests arriving
+    before the first check completes, or while the replica is unhealthy, read
+    from the primary.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        *,
+        max_lag: float,
+        check_interval: float,
+    ) -> None:
+        self._session_maker = session_maker
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+
+        self._checked_at = float("-inf")
+        self._healthy = False
+
+    async def session_maker(self) -> async_sessionmaker[AsyncSession] | None:
+        if monotonic() - self._checked_at >= self._check_interval:
+            # Set before awaiting, so concurrent requests do not all run the check
+            self._checked_at = monotonic()
+
+            healthy = await self._check()
+
+            if healthy != self._healthy:
+                logger.warning(f"Read replica is {'used' if healthy else 'skipped'} for reads")
+
+            self._healthy = healthy
+
+        return self._session_maker if self._healthy else None
+
+    async def _check(self) -> bool:
+        try:
+            async with asyncio.timeout(self._check_interval), self._session_maker() as db:
+                lag = await db.scalar(REPLICATION_LAG)
+        except (SQLAlchemyError, OSError, TimeoutError):
+            logger.warning("Read replica is unreachable", exc_info=True)
+            return False
+
+        if lag is None or lag > self._max_lag:
+            logger.warning(f"Read replica lags behind the primary by {lag} seconds")
+            return False
+
+        return True
+
+
+@cache
+def get_read_replica() -> ReadReplica | None:
+    engine = build_async_read_replica_engine()
+
+    if engine is None:
+        return None
+
+    replica_settings = get_read_replica_settings()
+
+    return ReadReplica(
+        build_async_session_maker(engine),
+        max_lag=replica_settings.max_lag,
+        check_interval=replica_settings.lag_check_interval,
+    )
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    # For read only endpoints which can tolerate a few seconds of replication lag
+    read_replica = get_read_replica()
+
+    local_session_maker = (
+        await read_replica.session_maker() if read_replica is not None else None
+    ) or _get_async_session_maker()
+
+    async with local_session_maker() as db:
+        yield db  # ruff:ignore[yield-in-context-manager-in-async-generator]
@@ -31,6 +31,9 @@ class ErrorCode(StrEnum):
     PHASE_NOT_FOUND = "phase_not_found"
     RULE_NOT_FOUND = "rule_not_found"
 
+    # Results
+    INVALID_CURSOR = "invalid_cursor"
+
     # Generic
     VALIDATION_ERROR = "validation_error"
     INTERNAL_SERVER_ERROR = "internal_server_error"
@@ -49,6 +52,8 @@ EXPIRED_REFRESH_TOKEN_MESSAGE = "Expired refresh token, re-authentication requir
 LOCKED_SCORE_BET_MESSAGE = "Cannot modify score bet, lock date is exceeded"
 LOCKED_BINARY_BET_MESSAGE = "Cannot modify binary bet, lock date is exceeded"
 RATE_LIMIT_EXCEEDED_MESSAGE = "Rate limit exceeded. Please try again later."
+INVALID_CURSOR_MESSAGE = "Invalid score board cursor"
+PASSWORD_HASHING_BUSY_MESSAGE = "Too many authentications in progress. Please try again later."
 
 
 def name_already_exists_message(user_name: str) -> str:
@@ -1,11 +1,19 @@
+from collections import defaultdict
 from collections.abc import Iterable
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
+from uuid import uuid4
 
 from sqlalchemy import update
 from sqlalchemy.orm import selectinload
 
-from yak_server.database.models import GroupPositionModel, MatchModel, ScoreBetModel
+from yak_server.database.models import (
+    GroupModel,
+    GroupPositionModel,
+    MatchModel,
+    PhaseModel,
+    ScoreBetModel,
+)
 
 if TYPE_CHECKING:
     from uuid import UUID
@@ -13,37 +21,47 @@ if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
     from yak_server.database.models import UserModel
+    from yak_server.helpers.authentication import Principal
 
 
-def create_group_position(score_bets: Iterable[ScoreBetModel]) -> list[GroupPositionModel]:
-    team_ids = []
+def create_group_position(matches: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Build one group position row per team playing the given score bet matches.
+
+    Returns:
+        Rows ready for a bulk insert into GroupPositionModel.
+    """
+    team_ids = set()
 
     group_positions = []
 
-    for score_bet in score_bets:
-        if score_bet.match.team1_id is not None and score_bet.match.team1_id not in team_ids:
-            group_positions.append(
-                GroupPositionModel(
-                    team_id=score_bet.match.team1_id,
-                    user_id=score_bet.match.user_id,
-                    group_id=score_bet.match.group_id,
-                ),
-            )
-            team_ids.append(score_bet.match.team1_id)
-
-        if score_bet.match.team2_id is not None and score_bet.match.team2_id not in team_ids:
-            group_positions.append(
-                GroupPositionModel(
-                    team_id=score_bet.match.team2_id,
-                    user_id=score_bet.match.user_id,
-                    group_id=score_bet.match.group_id,
-                ),
-            )
-            team_ids.append(score_bet.match.team2_id)
+    for match in matches:
+        for team_id in (match["team1_id"], match["team2_id"]):
+            if team_id is not None and team_id not in team_ids:
+                group_positions.append(
+                    {
+                        "id": uuid4(),
+                        "team_id": team_id,
+                        "user_id": match["user_id"],
+                        "group_id": match["group_id"],
+                    },
+                )
+                team_ids.add(team_id)
 
     return group_positions
 
 
+def sort_group_rank(group_rank: Iterable[GroupPositionModel]) -> list[GroupPositionModel]:
+    return sorted(
+        group_rank,
+        key=lambda team_result: (
+            team_result.points,
+            team_result.goals_difference,
+            team_result.goals_for,
+        ),
+        reverse=True,
+    )
+
+
 @dataclass
 class GroupPosition:
     won: int = 0
@@ -98,20 +116,12 @@ def compute_group_rank(
         group_position.goals_against = new_group_position[group_position.team_id].goals_against
         group_position.need_recomputation = False
 
-    return sorted(
-        group_rank,
-        key=lambda team_result: (
-            team_result.points,
-            team_result.goals_difference,
-            team_result.goals_for,
-        ),
-        reverse=True,
-    )
+    return sort_group_rank(group_rank)
 
 
 def get_group_rank_with_code(
     db: "Session",
-    user: "UserModel",
+    user: "UserModel | Principal",
     group_id: "UUID",
 ) -> list[GroupPositionModel]:
     group_rank = (
@@ -122,15 +132,7 @@ def get_group_rank_with_code(
     )
 
     if not any(group_position.need_recomputation for group_position in group_rank):
-        return sorted(
-            group_rank,
-            key=lambda team_result: (
-                team_result.points,
-                team_result.goals_difference,
-                team_result.goals_for,
-            ),
-            reverse=True,
-        )
+        return sort_group_rank(group_rank)
 
     score_bets = (
         db
@@ -144,15 +146,71 @@ def get_group_rank_with_code(
 
     db.commit()
 
-    return sorted(
-        group_rank_list,
-        key=lambda team_result: (
-            team_result.points,
-            team_result.goals_difference,
-            team_result.goals_for,
-        ),
-        reverse=True,
-    )
+    return group_rank_list
+
+
+def get_group_ranks_from_phase_code(
+    db: "Session",
+    phase_code: str,
+) -> dict[tuple["UUID", "UUID"], list[GroupPositionModel]]:
+    """Load every user's group rank for a phase, keyed by ``(user_id, group_id)``.
+
+    Stale rankings are recomputed in memory from a single score bet query and
+    flushed once, instead of being committed once per user and group. The
+    caller owns the transaction and is responsible for committing it.
+
+    Returns:
+        dict mapping ``(user_id, group_id)`` to the sorted group rank.
+    """
+    group_ranks: dict[tuple[UUID, UUID], list[GroupPositionModel]] = defaultdict(list)
+
+    for group_position in (
+        db
+        .query(GroupPositionModel)
+        .options(selectinload(GroupPositionModel.team))
+        .join(GroupModel, GroupModel.id == GroupPositionModel.group_id)
+        .join(GroupModel.phase)
+        .where(PhaseModel.code == phase_code)
+    ):
+        group_ranks[group_position.user_id, group_position.group_id].append(group_position)
+
+    need_recomputation = {
+        key
+        for key, group_rank in group_ranks.items()
+        if any(group_position.need_recomputation for group_position in group_rank)
+    }
+
+    if need_recomputation:
+        score_bets: dict[tuple[UUID, UUID], list[ScoreBetModel]] = defaultdict(list)
+
+        # Filtered by user and phase rather than by (user, group) pairs, which would send
+        # one literal pair per stale group. Bets of the up to date groups are skipped.
+        for score_bet in (
+            db
+            .query(ScoreBetModel)
+            .options(selectinload(ScoreBetModel.match))
+            .join(ScoreBetModel.match)
+            .join(GroupModel, GroupModel.id == MatchModel.group_id)
+            .join(GroupModel.phase)
+            .where(
+                PhaseModel.code == phase_code,
+                MatchModel.user_id.in_({user_id for user_id, _ in need_recomputation}),
+            )
+        ):
+            key = (score_bet.match.user_id, score_bet.match.group_id)
+
+            if key in need_recomputation:
+                score_bets[key].append(score_bet)
+
+        for key in need_recomputation:
+            group_ranks[key] = compute_group_rank(group_ranks[key], score_bets[key])
+
+        db.flush()
+
+    return {
+        key: group_rank if key in need_recomputation else sort_group_rank(group_rank)
+        for key, group_rank in group_ranks.items()
+    }
 
 
 def set_recomputation_flag(db: "Session", team_id: Optional["UUID"], user_id: "UUID") -> None:
@@ -0,0 +1,109 @@
+from typing import TYPE_CHECKING
+
+from sqlalchemy import cast, func, insert, select, text
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+
+from yak_server.database.models import (
+    GroupModel,
+    LeaderboardModel,
+    Role,
+    UserKnockoutGuessModel,
+    UserModel,
+)
+from yak_server.helpers.version_counter import SCORE_BOARD_VERSION, bump_version
+
+if TYPE_CHECKING:
+    from sqlalchemy import Subquery
+    from sqlalchemy.orm import Session
+
+
+def _knockout_rounds() -> "Subquery":
+    return (
+        select(
+            UserKnockoutGuessModel.user_id,
+            func.jsonb_agg(
+                aggregate_order_by(
+                    func.jsonb_build_object(
+                        "group_id",
+                        UserKnockoutGuessModel.group_id,
+                        "count",
+                        UserKnockoutGuessModel.count,
+                    ),
+                    GroupModel.index,
+                ),
+                type_=JSONB,
+            ).label("knockout_rounds"),
+        )
+        .join(UserKnockoutGuessModel.group)
+        .group_by(UserKnockoutGuessModel.user_id)
+        .subquery()
+    )
+
+
+def refresh_leaderboard(db: "Session") -> None:
+    """Rebuild the leaderboard from the current user points.
+
+    Ranks and knockout summary are computed once here so the score board and
+    results endpoints only read precomputed rows. The caller is responsible
+    for committing.
+    """
+    knockout_rounds = _knockout_rounds()
+
+    # Points may still be pending on the user instances
+    db.flush()
+
+    # Concurrent rebuilds would insert the same users twice, readers are not blocked
+    db.execute(text("LOCK TABLE leaderboard IN SHARE ROW EXCLUSIVE MODE"))
+
+    db.query(LeaderboardModel).delete()
+
+    db.execute(
+        insert(LeaderboardModel).from_select(
+            ["user_id", "rank", "points", "knockout_rounds"],
+            select(
+                UserModel.id,
+                func.row_number().over(order_by=(UserModel.points.desc(), UserModel.id)),
+                UserModel.points,
+                func.coalesce(knockout_rounds.c.knockout_rounds, cast("[]", JSONB)),
+            )
+            .outerjoin(knockout_rounds, knockout_rounds.c.user_id == UserModel.id)
+            .where(UserModel.role != Role.ADMIN),
+        )
+    )
+
+    bump_version(db, SCORE_BOARD_VERSION)
+
+
+def add_to_leaderboard(db: "Session", user: "UserModel") -> None:
+    """Rank a new player last, without rebuilding the leaderboard.
+
+    The player has no points yet, the next full rebuild ranks it among the
+    others. The caller is responsible for committing.
+    """
+    knockout_rounds = _knockout_rounds()
+
+    db.flush()
+
+    # Same lock as a rebuild, concurrent signups would otherwise get the same rank
+    db.execute(text("LOCK TABLE leaderboard IN SHARE ROW EXCLUSIVE MODE"))
+
+    db.execute(
+        insert(LeaderboardModel).from_select(
+            ["user_id", "rank", "points", "knockout_rounds"],
+            select(
+                UserModel.id,
+                select(func.coalesce(func.max(LeaderboardModel.rank), 0) + 1).scalar_subquery(),
+                UserModel.points,
+                func.coalesce(knockout_rounds.c.knockout_rounds, cast("[]", JSONB)),
+            )
+            .outerjoin(knockout_rounds, knockout_rounds.c.user_id == UserModel.id)
+            .where(UserModel.id == user.id),
+        )
+    )
+
+    bump_version(db, SCORE_BOARD_VERSION)
+
+
+def count_players(db: "Session") -> int:
+    # Ranks run from one to the number of players, read from the rank index
+    return db.scalar(select(func.coalesce(func.max(LeaderboardModel.rank), 0))) or 0
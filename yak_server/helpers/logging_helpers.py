@@ -2,7 +2,20 @@ import logging
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from yak_server.database.models import BinaryBetModel, ScoreBetModel
+    from yak_server.database.models import BinaryBetModel, MatchModel, ScoreBetModel
+
+    from .reference_data import ReferenceData
+
+
+def _match_description(match: "MatchModel", reference_data: "ReferenceData") -> str:
+    team1 = reference_data.teams_by_id[match.team1_id] if match.team1_id is not None else None
+    team2 = reference_data.teams_by_id[match.team2_id] if match.team2_id is not None else None
+
+    return (
+        f"{team1.description_en if team1 else None}"
+        f"-{team2.description_en if team2 else None} "
+        f"in {reference_data.groups_by_id[match.group_id].description_en}"
+    )
 
 
 def modify_score_bet_successfully(
@@ -10,12 +23,11 @@ def modify_score_bet_successfully(
     original_bet: "ScoreBetModel",
     new_score1: int | None,
     new_score2: int | None,
+    *,
+    reference_data: "ReferenceData",
 ) -> str:
     return (
-        f"{user_name} modify "
-        f"{original_bet.match.team1.description_en if original_bet.match.team1 else None}"
-        f"-{original_bet.match.team2.description_en if original_bet.match.team2 else None} "
-        f"in {original_bet.match.group.description_en} "
+        f"{user_name} modify {_match_description(original_bet.match, reference_data)} "
         f"from {original_bet.score1}-{original_bet.score2} "
         f"to {new_score1}-{new_score2}"
     )
@@ -26,12 +38,10 @@ def modify_binary_bet_successfully(
     original_bet: "BinaryBetModel",
     *,
     new_is_one_won: bool | None,
+    reference_data: "ReferenceData",
 ) -> str:
     return (
-        f"{user_name} modify "
-        f"{original_bet.match.team1.description_en if original_bet.match.team1 else None}"
-        f"-{original_bet.match.team2.description_en if original_bet.match.team2 else None} "
-        f"in {original_bet.match.group.description_en} "
+        f"{user_name} modify {_match_description(original_bet.match, reference_data)} "
         f"from {original_bet.is_one_won}-"
         f"{not original_bet.is_one_won if isinstance(original_bet.is_one_won, bool) else None} "
         f"to {new_is_one_won}-{not new_is_one_won if isinstance(new_is_one_won, bool) else None}"
@@ -0,0 +1,150 @@
+import logging
+import secrets
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cache
+from threading import Lock
+from typing import TypeVar
+
+from argon2 import (
+    DEFAULT_MEMORY_COST,
+    DEFAULT_PARALLELISM,
+    DEFAULT_TIME_COST,
+    PasswordHasher,
+)
+from pydantic import NonNegativeInt, PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHashingSettings(BaseSettings):
+    workers: PositiveInt = 4
+    # Every job holds a request thread while it waits, keep workers + max_queue
+    # well below the request threadpool size (40 threads by default)
+    max_queue: NonNegativeInt = 8
+
+    time_cost: PositiveInt = DEFAULT_TIME_COST
+    memory_cost: PositiveInt = DEFAULT_MEMORY_COST  # kibibytes
+    parallelism: PositiveInt = DEFAULT_PARALLELISM
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="password_hashing_",
+        extra="allow",
+    )
+
+
+class PasswordHashingBusyError(Exception):
+    def __init__(self) -> None:
+        super().__init__("Password hashing pool is saturated")
+
+
+@dataclass(frozen=True, kw_only=True)
+class PasswordHashingMetrics:
+    workers: int
+    max_queue: int
+    running: int
+    queued: int
+    rejected: int
+
+
+class PasswordHashingPool:
+    """Run argon2 on a dedicated, size-limited executor.
+
+    Hashing holds a CPU for tens of milliseconds, so it gets its own workers
+    instead of competing with the request threadpool. Once `workers` jobs run
+    and `max_queue` more are waiting, new jobs are rejected right away with
+    PasswordHashingBusyError rather than piling up request threads.
+
+    The caller's thread waits for the result, so at most `workers + max_queue`
+    request threads are held by hashing, the rest of the threadpool keeps
+    serving other endpoints.
+    """
+
+    def __init__(self, hasher: PasswordHasher, *, workers: int, max_queue: int) -> None:
+        self._hasher = hasher
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._workers = workers
+        self._max_queue = max_queue
+
+        self._lock = Lock()
+        self._pending = 0
+        self._running = 0
+        self._rejected = 0
+
+        # Unknown users are checked against this hash so a failed login costs
+        # the same whether the name exists or not
+        self._dummy_hash = hasher.hash(secrets.token_urlsafe())
+
+    def _run(self, function: Callable[..., T], *args: str) -> T:
+        with self._lock:
+            self._running += 1
+
+        try:
+            return function(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _submit(self, function: Callable[..., T], *args: str) -> T:
+        with self._lock:
+            if self._pending >= self._workers + self._max_queue:
+                self._rejected += 1
+
+                logger.warning(
+                    f"Password hashing pool is saturated: {self._pending} pending jobs,"
+                    f" {self._rejected} rejected so far",
+                )
+
+                raise PasswordHashingBusyError
+
+            self._pending += 1
+
+        try:
+            return self._executor.submit(self._run, function, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash(self, password: str) -> str:
+        return self._submit(self._hasher.hash, password)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._submit(self._hasher.verify, password_hash, password)
+
+    def verify_dummy(self, password: str) -> bool:
+        return self.verify(self._dummy_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # Only parses the hash parameters, cheap enough to skip the executor
+        return self._hasher.check_needs_rehash(password_hash)
+
+    def metrics(self) -> PasswordHashingMetrics:
+        with self._lock:
+            return PasswordHashingMetrics(
+                workers=self._workers,
+                max_queue=self._max_queue,
+                running=self._running,
+                queued=self._pending - self._running,
+                rejected=self._rejected,
+            )
+
+
+@cache
+def get_password_hasher() -> PasswordHashingPool:
+    settings = PasswordHashingSettings()
+
+    return PasswordHashingPool(
+        PasswordHasher(
+            time_cost=settings.time_cost,
+            memory_cost=settings.memory_cost,
+            parallelism=settings.parallelism,
+        ),
+        workers=settings.workers,
+        max_queue=settings.max_queue,
+    )
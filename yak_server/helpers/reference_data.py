@@ -0,0 +1,179 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from hashlib import blake2b
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from yak_server.database.models import GroupModel, PhaseModel, TeamModel
+
+from .database import new_async_session
+from .version_counter import REFERENCE_DATA_VERSION, bump_version, get_shared_versions
+
+
+@dataclass(frozen=True, kw_only=True)
+class Phase:
+    id: UUID
+    code: str
+    index: int
+    description_fr: str
+    description_en: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class Group:
+    id: UUID
+    code: str
+    index: int
+    phase_id: UUID
+    description_fr: str
+    description_en: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class Team:
+    id: UUID
+    code: str
+    index: int
+    description_fr: str
+    description_en: str
+    internal_flag_path: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class ReferenceData:
+    """Immutable snapshot of phases, groups and teams.
+
+    These rows only change when `yak db init` runs, so they are loaded once per
+    process and every lookup is served from memory. `version` is a digest of
+    the content, so it is the same in every worker serving the same data.
+    """
+
+    version: str
+
+    phases: tuple[Phase, ...]
+    groups: tuple[Group, ...]
+    teams: tuple[Team, ...]
+
+    phases_by_id: Mapping[UUID, Phase]
+    phases_by_code: Mapping[str, Phase]
+    groups_by_id: Mapping[UUID, Group]
+    groups_by_code: Mapping[str, Group]
+    groups_by_phase_id: Mapping[UUID, tuple[Group, ...]]
+    teams_by_id: Mapping[UUID, Team]
+    teams_by_index: Mapping[int, Team]
+
+
+def load_reference_data(db: Session) -> ReferenceData:
+    phases = tuple(
+        Phase(
+            id=phase.id,
+            code=phase.code,
+            index=phase.index,
+            description_fr=phase.description_fr,
+            description_en=phase.description_en,
+        )
+        for phase in db.query(PhaseModel).order_by(PhaseModel.index)
+    )
+
+    groups = tuple(
+        Group(
+            id=group.id,
+            code=group.code,
+            index=group.index,
+            phase_id=group.phase_id,
+            description_fr=group.description_fr,
+            description_en=group.description_en,
+        )
+        for group in db.query(GroupModel).order_by(GroupModel.index)
+    )
+
+    teams = tuple(
+        Team(
+            id=team.id,
+            code=team.code,
+            index=team.index,
+            description_fr=team.description_fr,
+            description_en=team.description_en,
+            internal_flag_path=team.internal_flag_path,
+        )
+        for team in db.query(TeamModel).order_by(TeamModel.index)
+    )
+
+    return ReferenceData(
+        version=blake2b(repr((phases, groups, teams)).encode(), digest_size=16).hexdigest(),
+        phases=phases,
+        groups=groups,
+        teams=teams,
+        phases_by_id={phase.id: phase for phase in phases},
+        phases_by_code={phase.code: phase for phase in phases},
+        groups_by_id={group.id: group for group in groups},
+        groups_by_code={group.code: group for group in groups},
+        groups_by_phase_id={
+            phase.id: tuple(group for group in groups if group.phase_id == phase.id)
+            for phase in phases
+        },
+        teams_by_id={team.id: team for team in teams},
+        teams_by_index={team.index: team for team in teams},
+    )
+
+
+class ReferenceDataCache:
+    """Process wide snapshot of the reference data.
+
+    The snapshot is tagged with the reference data version counter, polled
+    with the other shared versions at most once per interval, so a `yak db
+    init` or `yak db delete` run from another process is picked up by each
+    worker within the interval instead of serving stale teams and groups.
+
+    Loading happens without any lock: called through `AsyncSession.run_sync`,
+    the queries hand control back to the event loop, and another request
+    blocking on a thread lock there would freeze the whole worker. Concurrent
+    cold lookups may load the data more than once, the last one is kept.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: tuple[int, ReferenceData] | None = None
+
+    async def get(self, db: AsyncSession) -> ReferenceData:
+        # Read before loading, data committed in between is loaded again next time
+        versions = await get_shared_versions().get(db)
+        version = versions.get(REFERENCE_DATA_VERSION, 0)
+
+        snapshot = self._snapshot
+
+        if snapshot is not None and snapshot[0] == version:
+            return snapshot[1]
+
+        reference_data = await db.run_sync(load_reference_data)
+
+        self._snapshot = (version, reference_data)
+
+        return reference_data
+
+    def reload(self) -> None:
+        self._snapshot = None
+
+
+reference_data_cache = ReferenceDataCache()
+
+
+async def get_reference_data() -> ReferenceData:
+    # Own session, released before the endpoint runs and unused while the snapshot is current
+    async with new_async_session() as db:
+        return await reference_data_cache.get(db)
+
+
+def invalidate_reference_data(db: Session) -> None:
+    """Outdate the reference data cached by every worker.
+
+    The caller is responsible for committing.
+    """
+    bump_version(db, REFERENCE_DATA_VERSION)
+
+
+def reload_reference_data() -> None:
+    """Drop the reference data cached by this process, next lookup will load it again."""
+    reference_data_cache.reload()
+    get_shared_versions().expire()
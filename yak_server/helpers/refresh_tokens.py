@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from datetime import UTC, datetime
+from uuid import UUID
+
+from pydantic import NonNegativeInt, PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import delete, false, func, insert, literal, null, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from yak_server.database.models import RefreshTokenModel, UserModel
+
+from .database import new_session
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenPruningSettings(BaseSettings):
+    interval: NonNegativeInt = 0  # seconds, 0 disables the background task
+    batch_size: PositiveInt = 1000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="refresh_token_pruning_",
+        extra="allow",
+    )
+
+
+def rotate_refresh_token(
+    db: Session,
+    old_jti: UUID,
+    new_jti: UUID,
+    expires_at: datetime,
+) -> UserModel | None:
+    """Revoke a refresh token and store its replacement in a single statement.
+
+    The old token is only updated while still valid, so out of two concurrent
+    rotations of the same token, the second one waits for the row lock and
+    then matches nothing. The caller is responsible for committing.
+
+    Returns:
+        Owner of the token, or None if it is unknown, revoked or expired.
+    """
+    rotated = (
+        update(RefreshTokenModel)
+        .where(
+            RefreshTokenModel.id == old_jti,
+            RefreshTokenModel.revoked.is_(False),
+            RefreshTokenModel.expires_at > func.now(),
+        )
+        .values(revoked=True, replaced_by_token=new_jti)
+        .returning(RefreshTokenModel.user_id)
+        .cte("rotated")
+    )
+
+    inserted = (
+        insert(RefreshTokenModel)
+        .from_select(
+            ["id", "user_id", "revoked", "replaced_by_token", "created_at", "expires_at"],
+            select(
+                literal(new_jti, RefreshTokenModel.id.type),
+                rotated.c.user_id,
+                false(),
+                null(),
+                func.now(),
+                literal(expires_at, RefreshTokenModel.expires_at.type),
+            ),
+        )
+        .returning(RefreshTokenModel.user_id)
+        .cte("inserted")
+    )
+
+    return db.scalars(
+        select(UserModel).join(inserted, inserted.c.user_id == UserModel.id),
+    ).first()
+
+
+def revoke_reused_refresh_token(db: Session, jti: UUID) -> bool:
+    """Revoke every token of a user if an already rotated token is presented again.
+
+    Replaying a rotated token means it leaked, or that the legitimate client
+    lost the race against whoever holds a copy, so the whole session is ended.
+
+    Returns:
+        True if the token had been rotated before.
+    """
+    user_id = db.scalar(
+        select(RefreshTokenModel.user_id).where(
+            RefreshTokenModel.id == jti,
+            RefreshTokenModel.replaced_by_token.is_not(None),
+        ),
+    )
+
+    if user_id is None:
+        return False
+
+    db.execute(
+        update(RefreshTokenModel)
+        .where(RefreshTokenModel.user_id == user_id, RefreshTokenModel.revoked.is_(False))
+        .values(revoked=True),
+    )
+    db.commit()
+
+    logger.warning(f"Reuse of rotated refresh token {jti}, all tokens of user {user_id} revoked")
+
+    return True
+
+
+def prune_refresh_tokens(db: Session, batch_size: int) -> int:
+    """Delete expired refresh tokens, one batch per transaction.
+
+    Revoked tokens are kept until they expire: a rotated token presented again
+    must still be recognized by revoke_reused_refresh_token. Rows locked by a
+    concurrent pruning are skipped, so several workers can run it at the same
+    time.
+
+    Returns:
+        Number of deleted tokens.
+    """
+    dead_tokens = RefreshTokenModel.expires_at <= datetime.now(UTC)
+
+    deleted = 0
+
+    while True:
+        batch = (
+            select(RefreshTokenModel.id)
+            .where(dead_tokens)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        batch_deleted = len(
+            db.scalars(
+                delete(RefreshTokenModel)
+                .where(RefreshTokenModel.id.in_(batch))
+                .returning(RefreshTokenModel.id),
+            ).all(),
+        )
+        db.commit()
+
+        deleted += batch_deleted
+
+        if batch_deleted < batch_size:
+            return deleted
+
+
+def _prune_refresh_tokens_in_new_session(batch_size: int) -> int:
+    with new_session() as db:
+        return prune_refresh_tokens(db, batch_size)
+
+
+async def prune_refresh_tokens_periodically(interval: int, batch_size: int) -> None:
+    while True:
+        try:
+            deleted = await run_in_threadpool(_prune_refresh_tokens_in_new_session, batch_size)
+        except Exception:
+            logger.exception("Refresh token pruning failed")
+        else:
+            logger.info(f"Pruned {deleted} refresh tokens")
+
+        await asyncio.sleep(interval)
@@ -6,6 +6,7 @@ from sqlalchemy.orm import selectinload
 
 from yak_server.database.models import BinaryBetModel, GroupModel, MatchModel, PhaseModel
 from yak_server.helpers.group_position import get_group_rank_with_code
+from yak_server.helpers.version_counter import bets_version, bump_version
 
 if TYPE_CHECKING:
     from uuid import UUID
@@ -163,6 +164,8 @@ def compute_finale_phase_from_group_rank(
 
         db.flush()
 
+    bump_version(db, bets_version(user.id))
+
     db.commit()
 
     return status.HTTP_200_OK, ""
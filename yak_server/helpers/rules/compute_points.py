@@ -1,12 +1,14 @@
+from collections import defaultdict
 from collections.abc import Iterable
-from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
 from fastapi import status
 from pydantic import BaseModel
+from sqlalchemy import and_, bindparam, func, select, update
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from yak_server.database.models import (
     BinaryBetModel,
@@ -16,14 +18,18 @@ from yak_server.database.models import (
     Role,
     ScoreBetModel,
     UserKnockoutGuessModel,
+    UserMatchPointsModel,
     UserModel,
 )
-from yak_server.helpers.group_position import get_group_rank_with_code
+from yak_server.helpers.group_position import get_group_ranks_from_phase_code
+from yak_server.helpers.leaderboard import refresh_leaderboard
+from yak_server.helpers.version_counter import SCORED_PLAYERS, get_version, set_version
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
     from yak_server.database.models import GroupPositionModel
+    from yak_server.helpers.authentication import Principal
 
 
 class KnockoutRoundConfig(BaseModel):
@@ -46,50 +52,155 @@ class RuleComputePoints(BaseModel):
 
 @dataclass
 class ResultForScoreBet:
-    number_correct_result: int = 0
-    user_ids_found_correct_result: list[UUID] = field(default_factory=list)
-    number_correct_score: int = 0
-    user_ids_found_correct_score: list[UUID] = field(default_factory=list)
+    number_match_guess: int = 0
+    number_score_guess: int = 0
+    points: float = 0
+
+
+def correct_guess_points(
+    base: int,
+    multiplying_factor: int,
+    numbers_of_players: int,
+    number_correct: int,
+) -> float:
+    # A single player league has nobody to be compared with, only the base is granted.
+    if numbers_of_players <= 1:
+        return base
+
+    return base + multiplying_factor * (numbers_of_players - number_correct) / (
+        numbers_of_players - 1
+    )
 
 
-def compute_results_for_score_bet(db: "Session", admin: UserModel) -> list[ResultForScoreBet]:
-    results: list[ResultForScoreBet] = []
+def compute_results_for_score_bet(
+    db: "Session",
+    admin: "UserModel | Principal",
+    rule_config: RuleComputePoints,
+    numbers_of_players: int,
+    *,
+    admin_match_id: UUID | None = None,
+) -> dict[tuple[UUID, int], dict[UUID, ResultForScoreBet]]:
+    """Score every user on each admin match, keyed by ``(group_id, index)``.
+
+    Pass ``admin_match_id`` to restrict the computation to a single match.
+
+    Returns:
+        dict mapping each match to the results of the users who guessed it.
+    """
+    admin_match = aliased(MatchModel)
+    admin_score = aliased(ScoreBetModel)
+    user_match = aliased(MatchModel)
+    user_score = aliased(ScoreBetModel)
+
+    # sign() is NULL as soon as one score is missing, so unfilled bets never match.
+    same_result = func.sign(user_score.score1 - user_score.score2) == func.sign(
+        admin_score.score1 - admin_score.score2
+    )
+    same_score = and_(
+        same_result,
+        user_score.score1 == admin_score.score1,
+        user_score.score2 == admin_score.score2,
+    )
 
-    for real_score in (
-        db
-        .query(ScoreBetModel)
-        .options(selectinload(ScoreBetModel.match))
-        .join(ScoreBetModel.match)
-        .where(MatchModel.user_id == admin.id)
-    ):
-        result_for_score_bet = ResultForScoreBet()
-
-        for user_score in (
-            db
-            .query(ScoreBetModel)
-            .options(selectinload(ScoreBetModel.match))
-            .join(ScoreBetModel.match)
-            .where(
-                MatchModel.user_id != admin.id,
-                MatchModel.index == real_score.match.index,
-                MatchModel.group_id == real_score.match.group_id,
+    query = (
+        select(
+            admin_match.group_id,
+            admin_match.index,
+            func.count().filter(same_result),
+            func.array_agg(user_match.user_id).filter(same_result),
+            func.count().filter(same_score),
+            func.array_agg(user_match.user_id).filter(same_score),
+        )
+        .select_from(admin_score)
+        .join(admin_match, admin_score.match_id == admin_match.id)
+        .join(
+            user_match,
+            and_(
+                user_match.group_id == admin_match.group_id,
+                user_match.index == admin_match.index,
+                user_match.user_id != admin.id,
+            ),
+        )
+        .join(user_score, user_score.match_id == user_match.id)
+        .where(admin_match.user_id == admin.id)
+        .group_by(admin_match.group_id, admin_match.index)
+    )
+
+    if admin_match_id is not None:
+        query = query.where(admin_match.id == admin_match_id)
+
+    results: dict[tuple[UUID, int], dict[UUID, ResultForScoreBet]] = {}
+
+    for (
+        group_id,
+        index,
+        number_correct_result,
+        user_ids_found_correct_result,
+        number_correct_score,
+        user_ids_found_correct_score,
+    ) in db.execute(query):
+        match_results: dict[UUID, ResultForScoreBet] = defaultdict(ResultForScoreBet)
+
+        for user_id in user_ids_found_correct_result or []:
+            match_results[user_id].number_match_guess += 1
+            match_results[user_id].points += correct_guess_points(
+                rule_config.base_correct_result,
+                rule_config.multiplying_factor_correct_result,
+                numbers_of_players,
+                number_correct_result,
             )
-        ):
-            if user_score.is_same_results(real_score):
-                result_for_score_bet.number_correct_result += 1
-                result_for_score_bet.user_ids_found_correct_result.append(user_score.match.user_id)
-
-                if user_score.is_same_scores(real_score):
-                    result_for_score_bet.number_correct_score += 1
-                    result_for_score_bet.user_ids_found_correct_score.append(
-                        user_score.match.user_id,
-                    )
 
-        results.append(result_for_score_bet)
+        for user_id in user_ids_found_correct_score or []:
+            match_results[user_id].number_score_guess += 1
+            match_results[user_id].points += correct_guess_points(
+                rule_config.base_correct_score,
+                rule_config.multiplying_factor_correct_score,
+                numbers_of_players,
+                number_correct_score,
+            )
+
+        results[group_id, index] = match_results
+
+    return results
+
+
+def sum_results_for_score_bet(
+    match_results: dict[tuple[UUID, int], dict[UUID, ResultForScoreBet]],
+) -> dict[UUID, ResultForScoreBet]:
+    results: dict[UUID, ResultForScoreBet] = defaultdict(ResultForScoreBet)
+
+    for results_by_user in match_results.values():
+        for user_id, result in results_by_user.items():
+            results[user_id].number_match_guess += result.number_match_guess
+            results[user_id].number_score_guess += result.number_score_guess
+            results[user_id].points += result.points
 
     return results
 
 
+def store_results_for_score_bet(
+    db: "Session",
+    match_results: dict[tuple[UUID, int], dict[UUID, ResultForScoreBet]],
+) -> None:
+    db.query(UserMatchPointsModel).delete()
+
+    values = [
+        {
+            "user_id": user_id,
+            "group_id": group_id,
+            "index": index,
+            "number_match_guess": result.number_match_guess,
+            "number_score_guess": result.number_score_guess,
+            "points": result.points,
+        }
+        for (group_id, index), results_by_user in match_results.items()
+        for user_id, result in results_by_user.items()
+    ]
+
+    if values:
+        db.execute(insert(UserMatchPointsModel), values)
+
+
 @dataclass
 class ResultForGroupRank:
     number_qualified_teams_guess: int = 0
@@ -102,14 +213,16 @@ def all_results_filled_in_group(group_result: list["GroupPositionModel"]) -> boo
 
 def compute_results_for_group_rank(
     db: "Session",
-    admin: UserModel,
+    admin: "UserModel | Principal",
     other_users: Iterable[UserModel],
     admin_knockout_teams: set[UUID],
 ) -> dict[UUID, ResultForGroupRank]:
     result_groups: dict[UUID, ResultForGroupRank] = {}
 
+    group_ranks = get_group_ranks_from_phase_code(db, "GROUP")
+
     for group in db.query(GroupModel).join(GroupModel.phase).where(PhaseModel.code == "GROUP"):
-        group_result_admin = get_group_rank_with_code(db, admin, group.id)
+        group_result_admin = group_ranks.get((admin.id, group.id), [])
 
         if all_results_filled_in_group(group_result_admin):
             admin_first_team_id = group_result_admin[0].team.id
@@ -122,7 +235,7 @@ def compute_results_for_group_rank(
                 if other_user.id not in result_groups:
                     result_groups[other_user.id] = ResultForGroupRank()
 
-                group_result_user = get_group_rank_with_code(db, other_user, group.id)
+                group_result_user = group_ranks.get((other_user.id, group.id), [])
 
                 if all_results_filled_in_group(group_result_user):
                     n = len(admin_qualified_ids)
@@ -138,7 +251,11 @@ def compute_results_for_group_rank(
     return result_groups
 
 
-def team_from_group_code(db: "Session", user: UserModel, group_code: str) -> set[UUID]:
+def team_from_group_code(
+    db: "Session",
+    user: "UserModel | Principal",
+    group_code: str,
+) -> set[UUID]:
     results: set[UUID] = set()
 
     for bet in (
@@ -158,31 +275,43 @@ def team_from_group_code(db: "Session", user: UserModel, group_code: str) -> set
     return results
 
 
-def winner_from_user(db: "Session", user: UserModel) -> set[UUID]:
-    finale_bet = next(
-        iter(
-            db
-            .query(BinaryBetModel)
-            .options(
-                selectinload(BinaryBetModel.match).selectinload(MatchModel.team1),
-                selectinload(BinaryBetModel.match).selectinload(MatchModel.team2),
-            )
-            .join(BinaryBetModel.match)
-            .join(MatchModel.group)
-            .where(MatchModel.user_id == user.id, GroupModel.code == "1"),
-        ),
-    )
+def teams_by_user_from_group_code(db: "Session", group_code: str) -> dict[UUID, set[UUID]]:
+    results: dict[UUID, set[UUID]] = defaultdict(set)
 
-    if (
-        finale_bet.is_one_won is None
-        or finale_bet.match.team1 is None
-        or finale_bet.match.team2 is None
+    for user_id, team1_id, team2_id in (
+        db
+        .query(MatchModel.user_id, MatchModel.team1_id, MatchModel.team2_id)
+        .join(BinaryBetModel, BinaryBetModel.match_id == MatchModel.id)
+        .join(MatchModel.group)
+        .where(GroupModel.code == group_code)
     ):
-        return set()
+        if team1_id is not None:
+            results[user_id].add(team1_id)
+
+        if team2_id is not None:
+            results[user_id].add(team2_id)
+
+    return results
 
-    return {
-        finale_bet.match.team1.id if finale_bet.is_one_won else finale_bet.match.team2.id,
-    }
+
+def winners_by_user(db: "Session") -> dict[UUID, UUID]:
+    winners: dict[UUID, UUID] = {}
+
+    for user_id, is_one_won, team1_id, team2_id in (
+        db
+        .query(
+            MatchModel.user_id, BinaryBetModel.is_one_won, MatchModel.team1_id, MatchModel.team2_id
+        )
+        .join(BinaryBetModel, BinaryBetModel.match_id == MatchModel.id)
+        .join(MatchModel.group)
+        .where(GroupModel.code == "1")
+    ):
+        if is_one_won is None or team1_id is None or team2_id is None:
+            continue
+
+        winners[user_id] = team1_id if is_one_won else team2_id
+
+    return winners
 
 
 def compute_points(
@@ -190,9 +319,29 @@ def compute_points(
     admin: UserModel,
     rule_config: RuleComputePoints,
 ) -> tuple[int, str]:
-    results = compute_results_for_score_bet(db, admin)
+    compute_all_points(db, admin, rule_config)
 
-    other_users = db.query(UserModel).where(UserModel.role == Role.USER)
+    db.commit()
+
+    return status.HTTP_200_OK, ""
+
+
+def compute_all_points(
+    db: "Session",
+    admin: "UserModel | Principal",
+    rule_config: RuleComputePoints,
+) -> None:
+    """Score every user from scratch and rebuild the leaderboard.
+
+    The caller is responsible for committing.
+    """
+    other_users = db.query(UserModel).where(UserModel.role == Role.USER).all()
+
+    match_results = compute_results_for_score_bet(db, admin, rule_config, len(other_users))
+    store_results_for_score_bet(db, match_results)
+    set_version(db, SCORED_PLAYERS, len(other_users))
+
+    results = sum_results_for_score_bet(match_results)
 
     admin_first_knockout_teams = team_from_group_code(
         db, admin, rule_config.first_knockout_group_code
@@ -205,37 +354,26 @@ def compute_points(
         admin_knockout_teams=admin_first_knockout_teams,
     )
 
-    admin_knockout_teams = {
-        r.group_code: team_from_group_code(db, admin, r.group_code)
-        for r in rule_config.knockout_rounds
+    knockout_groups = {
+        group.code: group
+        for group in db.query(GroupModel).where(
+            GroupModel.code.in_({r.group_code for r in rule_config.knockout_rounds})
+        )
+    }
+    knockout_teams = {
+        group_code: teams_by_user_from_group_code(db, group_code) for group_code in knockout_groups
     }
-    admin_winner = winner_from_user(db, admin)
+    knockout_guesses: dict[str, list[dict[str, Any]]] = defaultdict(list)
 
-    numbers_of_players = other_users.count()
+    winners = winners_by_user(db)
+    admin_winner = winners.get(admin.id)
 
     for user in other_users:
-        user.number_score_guess = 0
-        user.number_match_guess = 0
-        user.points = 0
-
-        for result in results:
-            if user.id in result.user_ids_found_correct_result:
-                user.number_match_guess += 1
-                user.points += (
-                    rule_config.base_correct_result
-                    + rule_config.multiplying_factor_correct_result
-                    * (numbers_of_players - result.number_correct_result)
-                    / (numbers_of_players - 1)
-                )
-
-            if user.id in result.user_ids_found_correct_score:
-                user.number_score_guess += 1
-                user.points += (
-                    rule_config.base_correct_score
-                    + rule_config.multiplying_factor_correct_score
-                    * (numbers_of_players - result.number_correct_score)
-                    / (numbers_of_players - 1)
-                )
+        result = results.get(user.id, ResultForScoreBet())
+
+        user.number_match_guess = result.number_match_guess
+        user.number_score_guess = result.number_score_guess
+        user.points = result.points
 
         if user.id not in result_groups:
             continue
@@ -247,29 +385,163 @@ def compute_points(
         user.points += user.number_first_qualified_guess * rule_config.first_team_qualified
 
         for round_cfg in rule_config.knockout_rounds:
-            group = db.query(GroupModel).filter_by(code=round_cfg.group_code).first()
+            group = knockout_groups.get(round_cfg.group_code)
 
             if group is None:
                 continue
 
-            count = len(
-                team_from_group_code(db, user, round_cfg.group_code).intersection(
-                    admin_knockout_teams[round_cfg.group_code]
-                ),
-            )
-            db.execute(
-                insert(UserKnockoutGuessModel)
-                .values(user_id=user.id, group_id=group.id, count=count)
-                .on_conflict_do_update(
-                    constraint="uq_user_knockout_guess",
-                    set_={"count": count},
-                )
-            )
+            teams = knockout_teams[round_cfg.group_code]
+
+            count = len(teams[user.id].intersection(teams[admin.id]))
+            knockout_guesses[round_cfg.group_code].append({
+                "user_id": user.id,
+                "group_id": group.id,
+                "count": count,
+            })
             user.points += count * round_cfg.points_per_team
 
-        user.number_winner_guess = len(winner_from_user(db, user).intersection(admin_winner))
+        user.number_winner_guess = int(
+            admin_winner is not None and winners.get(user.id) == admin_winner
+        )
         user.points += user.number_winner_guess * rule_config.winner_points
 
-    db.commit()
+    for values in knockout_guesses.values():
+        stmt = insert(UserKnockoutGuessModel).values(values)
+        db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_user_knockout_guess",
+                set_={"count": stmt.excluded.count},
+            )
+        )
 
-    return status.HTTP_200_OK, ""
+    refresh_leaderboard(db)
+
+
+def update_score_bet_points(
+    db: "Session",
+    admin: "UserModel | Principal",
+    rule_config: RuleComputePoints,
+    admin_match: MatchModel,
+    numbers_of_players: int,
+) -> dict[UUID, ResultForScoreBet]:
+    """Rescore ``admin_match`` and update the stored contributions of its users.
+
+    Returns:
+        dict mapping each user whose contribution changed to the difference.
+    """
+    new_results = compute_results_for_score_bet(
+        db, admin, rule_config, numbers_of_players, admin_match_id=admin_match.id
+    ).get((admin_match.group_id, admin_match.index), {})
+
+    old_results = {
+        user_match_points.user_id: user_match_points
+        for user_match_points in db.query(UserMatchPointsModel).filter_by(
+            group_id=admin_match.group_id, index=admin_match.index
+        )
+    }
+
+    deltas: dict[UUID, ResultForScoreBet] = {}
+
+    for user_id in new_results.keys() | old_results.keys():
+        new_result = new_results.get(user_id, ResultForScoreBet())
+        user_match_points = old_results.get(user_id)
+
+        if user_match_points is None:
+            user_match_points = UserMatchPointsModel(
+                user_id=user_id,
+                group_id=admin_match.group_id,
+                index=admin_match.index,
+                number_match_guess=0,
+                number_score_guess=0,
+                points=0,
+            )
+            db.add(user_match_points)
+
+        delta = ResultForScoreBet(
+            new_result.number_match_guess - user_match_points.number_match_guess,
+            new_result.number_score_guess - user_match_points.number_score_guess,
+            new_result.points - user_match_points.points,
+        )
+
+        if delta != ResultForScoreBet():
+            deltas[user_id] = delta
+
+        if user_id in new_results:
+            user_match_points.number_match_guess = new_result.number_match_guess
+            user_match_points.number_score_guess = new_result.number_score_guess
+            user_match_points.points = new_result.points
+        else:
+            db.delete(user_match_points)
+
+    return deltas
+
+
+def apply_points_deltas(db: "Session", deltas: dict[UUID, ResultForScoreBet]) -> None:
+    if not deltas:
+        return
+
+    # Executed on the connection to get a plain executemany UPDATE, the ORM would
+    # otherwise treat the parameter list as a bulk update by primary key.
+    db.connection().execute(
+        update(UserModel)
+        .where(UserModel.id == bindparam("user_id"))
+        .values(
+            number_match_guess=UserModel.number_match_guess + bindparam("delta_match_guess"),
+            number_score_guess=UserModel.number_score_guess + bindparam("delta_score_guess"),
+            points=UserModel.points + bindparam("delta_points"),
+        ),
+        [
+            {
+                "user_id": user_id,
+                "delta_match_guess": delta.number_match_guess,
+                "delta_score_guess": delta.number_score_guess,
+                "delta_points": delta.points,
+            }
+            for user_id, delta in deltas.items()
+        ],
+    )
+
+
+def compute_points_for_matches(
+    db: "Session",
+    admin: "UserModel | Principal",
+    rule_config: RuleComputePoints,
+    admin_matches: Iterable[MatchModel],
+) -> None:
+    """Incrementally rescore the users after a change on some admin matches.
+
+    Only the contributions of ``admin_matches`` are recomputed and the user totals
+    are updated by delta, so the ``user`` table is only written once for the
+    affected players, then the leaderboard is rebuilt once. It relies on the
+    per-match contributions stored by a previous ``compute_points`` run, which must
+    be run again to refresh the group rank, knockout and winner points. Every
+    contribution depends on the number of players, so all users are scored again
+    when it changed since that run. The caller is responsible for committing.
+    """
+    numbers_of_players = (
+        db.query(func.count(UserModel.id)).where(UserModel.role == Role.USER).scalar() or 0
+    )
+
+    if get_version(db, SCORED_PLAYERS) != numbers_of_players:
+        compute_all_points(db, admin, rule_config)
+        return
+
+    deltas: dict[UUID, ResultForScoreBet] = {}
+
+    for admin_match in admin_matches:
+        for user_id, delta in update_score_bet_points(
+            db, admin, rule_config, admin_match, numbers_of_players
+        ).items():
+            total = deltas.get(user_id, ResultForScoreBet())
+
+            deltas[user_id] = ResultForScoreBet(
+                total.number_match_guess + delta.number_match_guess,
+                total.number_score_guess + delta.number_score_guess,
+                total.points + delta.points,
+            )
+
+    apply_points_deltas(db, deltas)
+
+    refresh_leaderboard(db)
+
+    db.flush()
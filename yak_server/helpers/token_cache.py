@@ -0,0 +1,57 @@
+from functools import cache
+from hashlib import blake2b
+from time import time
+from typing import Any
+
+from pydantic import PositiveFloat, PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .authentication import decode_bearer_token
+from .ttl_cache import TTLCache
+
+
+class TokenCacheSettings(BaseSettings):
+    max_size: PositiveInt = 10_000
+    ttl: PositiveFloat = 300  # seconds, entries never outlive the token expiration
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="token_cache_",
+        extra="allow",
+    )
+
+
+@cache
+def get_token_cache() -> TTLCache[bytes, dict[str, Any]]:
+    settings = TokenCacheSettings()
+
+    return TTLCache(max_size=settings.max_size, ttl=settings.ttl)
+
+
+def decode_bearer_token_cached(token: str, secret_key: str) -> dict[str, Any]:
+    """Decode a token, skipping signature and claim checks for a token seen recently.
+
+    Only successfully decoded tokens are cached, keyed by a digest of the token
+    and the secret it was verified with. Invalid or expired tokens always go
+    through `decode_bearer_token` so they raise the same errors as before.
+
+    Returns:
+        Token claims.
+    """
+    token_cache = get_token_cache()
+
+    key = blake2b(f"{secret_key}\0{token}".encode(), digest_size=32).digest()
+
+    cached_claims = token_cache.get(key)
+
+    # nbf is already checked when the token is first decoded
+    if cached_claims is not None and time() < cached_claims["exp"]:
+        return cached_claims
+
+    claims: dict[str, Any] = decode_bearer_token(token, secret_key)
+
+    if "exp" in claims:
+        token_cache.set(key, claims, ttl=claims["exp"] - time())
+
+    return claims
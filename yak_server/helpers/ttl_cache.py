@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Once `max_size` entries are stored, adding one evicts the least recently
+    used. An entry may be given an earlier deadline than `ttl` when it is set.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+
+        self._lock = Lock()
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, deadline = entry
+
+            if monotonic() >= deadline:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        deadline = monotonic() + (self._ttl if ttl is None else min(ttl, self._ttl))
+
+        with self._lock:
+            self._entries[key] = (value, deadline)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from functools import cache
+from uuid import UUID
+
+from pydantic import PositiveFloat, PositiveInt
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from yak_server.database.models import Role, UserModel, VersionCounterModel
+
+from .ttl_cache import TTLCache
+from .version_counter import (
+    USER_VERSION_PREFIX,
+    USERS_VERSION,
+    bump_version,
+    get_shared_versions,
+    set_version,
+    user_version,
+)
+
+
+class UserCacheSettings(BaseSettings):
+    max_size: PositiveInt = 10_000
+    ttl: PositiveFloat = 60  # seconds
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="user_cache_",
+        extra="allow",
+    )
+
+
+@dataclass(frozen=True, kw_only=True)
+class CachedUser:
+    id: UUID
+    name: str
+    full_name: str
+    role: Role
+    token_version: int
+
+
+class UserCache:
+    """Users cached by this worker, dropped when another process changes them.
+
+    Each change bumps USERS_VERSION and records the new value under the
+    user_version of the changed user. Once the worker sees the counter move,
+    it reads which users changed since and drops only those, so a password
+    change does not send every polling client back to the database at once.
+    """
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        self._users: TTLCache[UUID, CachedUser] = TTLCache(max_size=max_size, ttl=ttl)
+        self._version: int | None = None
+
+    async def catch_up(self, db: AsyncSession, version: int) -> None:
+        previous = self._version
+
+        if version == previous:
+            return
+
+        if previous is None or version < previous:
+            # Changes made before are unknown, or the counters were dropped with the tables
+            self._users.clear()
+        else:
+            changed = set(
+                await db.scalars(
+                    select(VersionCounterModel.name).where(
+                        VersionCounterModel.name.startswith(USER_VERSION_PREFIX),
+                        VersionCounterModel.value > previous,
+                    ),
+                ),
+            )
+
+            if user_version(None) in changed:
+                self._users.clear()
+            else:
+                for name in changed:
+                    self._users.pop(UUID(name.removeprefix(USER_VERSION_PREFIX)))
+
+        self._version = version
+
+    def get(self, user_id: UUID) -> CachedUser | None:
+        return self._users.get(user_id)
+
+    def set(self, user: CachedUser, *, version: int | None) -> None:
+        # A catch up run while the user was loading may have missed this change
+        if version == self._version:
+            self._users.set(user.id, user)
+
+    def pop(self, user_id: UUID) -> None:
+        self._users.pop(user_id)
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._version = None
+
+    @property
+    def version(self) -> int | None:
+        return self._version
+
+
+@cache
+def get_user_cache() -> UserCache:
+    settings = UserCacheSettings()
+
+    return UserCache(max_size=settings.max_size, ttl=settings.ttl)
+
+
+async def get_cached_user(db: AsyncSession, user_id: UUID) -> CachedUser | None:
+    """Return the user, from the cache of this worker while it did not change.
+
+    The session is only used on a cache miss, or when the shared versions are
+    due to be read again.
+
+    Returns:
+        The user, or None if it does not exist.
+    """
+    user_cache = get_user_cache()
+
+    versions = await get_shared_versions().get(db)
+    await user_cache.catch_up(db, versions.get(USERS_VERSION, 0))
+
+    user = user_cache.get(user_id)
+
+    if user is None:
+        version = user_cache.version
+
+        row = (
+            await db.execute(
+                select(
+                    UserModel.id,
+                    UserModel.name,
+                    UserModel.first_name,
+                    UserModel.last_name,
+                    UserModel.role,
+                    UserModel.token_version,
+                ).where(UserModel.id == user_id),
+            )
+        ).first()
+
+        if row is None:
+            return None
+
+        user = CachedUser(
+            id=row.id,
+            name=row.name,
+            full_name=f"{row.first_name} {row.last_name}",
+            role=row.role,
+            token_version=row.token_version,
+        )
+
+        user_cache.set(user, version=version)
+
+    return user
+
+
+def invalidate_cached_user(db: Session, user_id: UUID | None) -> None:
+    """Drop a user from the cache of every worker, or all users if None.
+
+    To be called in the transaction changing its password or role, the caller
+    is responsible for committing. This worker drops it right away, the others
+    within the shared versions check interval.
+    """
+    set_version(db, user_version(user_id), bump_version(db, USERS_VERSION))
+
+    if user_id is not None:
+        get_user_cache().pop(user_id)
+    else:
+        get_user_cache().clear()
+
+
+def clear_user_cache() -> None:
+    get_user_cache().clear()
+    get_shared_versions().expire()
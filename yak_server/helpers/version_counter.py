@@ -0,0 +1,127 @@
+from collections.abc import Mapping
+from functools import cache
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from pydantic import PositiveFloat
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from yak_server.database.models import VersionCounterModel
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+SCORE_BOARD_VERSION = "score_board"
+# Bumped when phases, groups or teams are written
+REFERENCE_DATA_VERSION = "reference_data"
+# Bumped when a user is changed or deleted, see user_version
+USERS_VERSION = "users"
+USER_VERSION_PREFIX = "user:"
+# Not a version: number of players the stored user match points were computed with
+SCORED_PLAYERS = "scored_players"
+# Counters backing the process caches, polled together by SharedVersions
+SHARED_VERSIONS = (USERS_VERSION, REFERENCE_DATA_VERSION)
+
+
+class VersionCounterSettings(BaseSettings):
+    check_interval: PositiveFloat = 1  # seconds
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        env_prefix="version_counter_",
+        extra="allow",
+    )
+
+
+def bets_version(user_id: "UUID") -> str:
+    return f"bets:{user_id}"
+
+
+def user_version(user_id: "UUID | None") -> str:
+    # Holds the USERS_VERSION value of the last change of the user, None stands for all users
+    return f"{USER_VERSION_PREFIX}{user_id if user_id is not None else '*'}"
+
+
+def bump_version(db: "Session", name: str) -> int:
+    """Increment a version counter, the caller is responsible for committing.
+
+    Counters are bumped in the same transaction as the change they track so a
+    reader never sees a new version before the data it stands for.
+
+    Returns:
+        The new value of the counter.
+    """
+    stmt = insert(VersionCounterModel).values(name=name, value=1)
+
+    return db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": VersionCounterModel.value + 1},
+        ).returning(VersionCounterModel.value),
+    ).scalar_one()
+
+
+def set_version(db: "Session", name: str, value: int) -> None:
+    """Set a version counter, the caller is responsible for committing."""
+    stmt = insert(VersionCounterModel).values(name=name, value=value)
+
+    db.execute(stmt.on_conflict_do_update(index_elements=["name"], set_={"value": value}))
+
+
+def get_version(db: "Session", name: str) -> int:
+    value = db.scalar(select(VersionCounterModel.value).where(VersionCounterModel.name == name))
+
+    return value if value is not None else 0
+
+
+class SharedVersions:
+    """Values of the counters in SHARED_VERSIONS, as last read by this worker.
+
+    They are read with a single statement at most once per interval, so the
+    user cache and the reference data are served from memory without a
+    database round trip on each request. A change made through another worker
+    or the CLI is seen within the interval.
+    """
+
+    def __init__(self, *, check_interval: float) -> None:
+        self._check_interval = check_interval
+
+        self._checked_at = float("-inf")
+        self._versions: Mapping[str, int] | None = None
+
+    async def get(self, db: "AsyncSession") -> Mapping[str, int]:
+        if self._versions is not None and monotonic() - self._checked_at < self._check_interval:
+            return self._versions
+
+        # Set before awaiting, so concurrent requests keep using the previous values
+        # instead of all reading the counters. Until the first read, they all wait.
+        self._checked_at = monotonic()
+
+        try:
+            rows = await db.execute(
+                select(VersionCounterModel.name, VersionCounterModel.value).where(
+                    VersionCounterModel.name.in_(SHARED_VERSIONS),
+                ),
+            )
+        except BaseException:
+            self._checked_at = float("-inf")
+            raise
+
+        self._versions = dict(rows.tuples().all())
+
+        return self._versions
+
+    def expire(self) -> None:
+        """Read the counters again on next lookup, for changes made by this process."""
+        self._checked_at = float("-inf")
+
+
+@cache
+def get_shared_versions() -> SharedVersions:
+    return SharedVersions(check_interval=VersionCounterSettings().check_interval)
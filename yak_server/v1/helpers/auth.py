@@ -1,5 +1,5 @@
 from functools import partial
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 from uuid import UUID
 
 from fastapi import Depends, Request
@@ -8,10 +8,17 @@ from jwt import ExpiredSignatureError, PyJWTError
 from sqlalchemy.orm import Session, joinedload
 
 from yak_server.database.models import RefreshTokenModel, UserModel
-from yak_server.helpers.authentication import Permission, decode_bearer_token, has_permission
+from yak_server.helpers.authentication import (
+    Permission,
+    Principal,
+    decode_bearer_token,
+    has_permission,
+)
 from yak_server.helpers.cookies import ACCESS_TOKEN_COOKIE, REFRESH_TOKEN_COOKIE
-from yak_server.helpers.database import get_db
+from yak_server.helpers.database import new_async_session
 from yak_server.helpers.settings import AuthenticationSettings, get_authentication_settings
+from yak_server.helpers.token_cache import decode_bearer_token_cached
+from yak_server.helpers.user_cache import get_cached_user
 from yak_server.v1.models.users import RefreshIn
 
 from .errors import (
@@ -23,14 +30,13 @@ from .errors import (
     UserNotFound,
 )
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm.interfaces import ORMOption
+
 security = HTTPBearer(auto_error=False)
 
 
-def user_from_refresh_token(
-    db: Session,
-    secret_key: str,
-    refresh_token: str,
-) -> tuple[UserModel, UUID]:
+def jti_from_refresh_token(secret_key: str, refresh_token: str) -> UUID:
     try:
         data = decode_bearer_token(refresh_token, secret_key)
     except ExpiredSignatureError as exc:
@@ -38,7 +44,18 @@ def user_from_refresh_token(
     except PyJWTError as exc:
         raise InvalidRefreshToken from exc
 
-    jti = data["jti"]
+    try:
+        return UUID(data["jti"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidRefreshToken from exc
+
+
+def user_from_refresh_token(
+    db: Session,
+    secret_key: str,
+    refresh_token: str,
+) -> tuple[UserModel, UUID]:
+    jti = jti_from_refresh_token(secret_key, refresh_token)
 
     token_record = (
         db
@@ -53,17 +70,28 @@ def user_from_refresh_token(
     return token_record.user, jti
 
 
-def user_from_token(db: Session, secret_key: str, access_token: str) -> UserModel:
+def principal_from_token(secret_key: str, access_token: str) -> Principal:
     try:
-        data = decode_bearer_token(access_token, secret_key)
+        data = decode_bearer_token_cached(access_token, secret_key)
     except ExpiredSignatureError as exc:
         raise ExpiredToken from exc
     except PyJWTError as exc:
         raise InvalidToken from exc
 
-    user = db.query(UserModel).filter_by(id=data["sub"]).first()
+    try:
+        return Principal.from_claims(data)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidToken from exc
+
+
+def load_user(db: Session, principal: Principal, *options: "ORMOption") -> UserModel:
+    user = db.get(UserModel, principal.id, options=options)
     if not user:
-        raise UserNotFound(data["sub"])
+        raise UserNotFound(principal.id)
+
+    # Password changed since the token was issued
+    if user.token_version != principal.token_version:
+        raise InvalidToken
 
     return user
 
@@ -78,24 +106,41 @@ def _extract_token(
     return request.cookies.get(ACCESS_TOKEN_COOKIE)
 
 
-def require_permission(
+async def require_permission(
     required_permission: Permission,
     request: Request,
     access_token: Annotated[HTTPAuthorizationCredentials | None, Depends(security)],
-    db: Annotated[Session, Depends(get_db)],
     auth_settings: Annotated[AuthenticationSettings, Depends(get_authentication_settings)],
-) -> UserModel:
+) -> Principal:
     token = _extract_token(request, access_token)
 
     if token is None:
         raise InvalidToken
 
-    user = user_from_token(db, auth_settings.jwt_secret_key, token)
+    principal = principal_from_token(auth_settings.jwt_secret_key, token)
+
+    # Own session rather than the endpoint one: a cache hit does not connect, and sync
+    # endpoints do not hold a second connection while they run
+    async with new_async_session() as db:
+        user = await get_cached_user(db, principal.id)
 
+    if user is None:
+        raise UserNotFound(principal.id)
+
+    # Role may have changed since the token was issued
     if not has_permission(user, required_permission):
         raise UnauthorizedAccessToAdminAPI
 
-    return user
+    # Password changed since the token was issued
+    if user.token_version != principal.token_version:
+        raise InvalidToken
+
+    return Principal(
+        id=user.id,
+        name=user.name,
+        role=user.role,
+        token_version=user.token_version,
+    )
 
 
 require_user = partial(require_permission, Permission.USER)
@@ -5,7 +5,7 @@ from uuid import UUID
 
 from fastapi import Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from slowapi.errors import RateLimitExceeded as SlowApiRateLimitExceeded
 from sqlalchemy.exc import SQLAlchemyError
 from starlette.exceptions import HTTPException as StarletteHTTPException
@@ -14,11 +14,13 @@ from yak_server.helpers.errors import (
     EXPIRED_REFRESH_TOKEN_MESSAGE,
     EXPIRED_TOKEN_MESSAGE,
     INVALID_CREDENTIALS_MESSAGE,
+    INVALID_CURSOR_MESSAGE,
     INVALID_REFRESH_TOKEN_MESSAGE,
     INVALID_SIGNUP_TOKEN_MESSAGE,
     INVALID_TOKEN_MESSAGE,
     LOCKED_BINARY_BET_MESSAGE,
     LOCKED_SCORE_BET_MESSAGE,
+    PASSWORD_HASHING_BUSY_MESSAGE,
     RATE_LIMIT_EXCEEDED_MESSAGE,
     UNAUTHORIZED_ACCESS_TO_ADMIN_API_MESSAGE,
     ErrorCode,
@@ -31,6 +33,9 @@ from yak_server.helpers.errors import (
     team_not_found_message,
     user_not_found_message,
 )
+from yak_server.helpers.password_hasher import PasswordHashingBusyError
+
+from .etag import NotModified
 
 if TYPE_CHECKING:
     from fastapi import FastAPI
@@ -217,6 +222,24 @@ class RuleNotFound(YakHTTPException):
         )
 
 
+class InvalidCursor(YakHTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=INVALID_CURSOR_MESSAGE,
+            error_code=ErrorCode.INVALID_CURSOR,
+        )
+
+
+class PasswordHashingBusy(YakHTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=PASSWORD_HASHING_BUSY_MESSAGE,
+            error_code=ErrorCode.SERVICE_UNAVAILABLE,
+        )
+
+
 class RateLimitExceeded(YakHTTPException):
     def __init__(self) -> None:
         super().__init__(
@@ -296,6 +319,19 @@ def set_exception_handler(app: "FastAPI") -> None:
             },
         )
 
+    @app.exception_handler(NotModified)
+    def not_modified_handler(_: Request, not_modified: NotModified) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": not_modified.etag},
+        )
+
+    @app.exception_handler(PasswordHashingBusyError)
+    def password_hashing_busy_handler(
+        request: Request, _: PasswordHashingBusyError
+    ) -> JSONResponse:
+        return yak_http_exception_handler(request, PasswordHashingBusy())
+
     @app.exception_handler(SlowApiRateLimitExceeded)
     def rate_limit_exceeded_handler(request: Request, _: SlowApiRateLimitExceeded) -> JSONResponse:
         return yak_http_exception_handler(request, RateLimitExceeded())
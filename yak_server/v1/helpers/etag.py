@@ -0,0 +1,43 @@
+from hashlib import blake2b
+
+from fastapi import Request, Response
+
+
+class NotModified(Exception):  # ruff:ignore[error-suffix-on-exception-name]
+    def __init__(self, etag: str) -> None:
+        super().__init__(etag)
+        self.etag = etag
+
+
+def compute_etag(*parts: object) -> str:
+    digest = blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+
+    # Weak comparison, see RFC 9110 section 13.1.2
+    return any(
+        candidate.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for candidate in if_none_match.split(",")
+    )
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    """Set the ETag header and stop with 304 Not Modified if the client copy is fresh.
+
+    Call it before querying or serializing the payload so a matching
+    If-None-Match skips both.
+
+    Raises:
+        NotModified: If-None-Match matches the current ETag.
+    """
+    if_none_match = request.headers.get("If-None-Match")
+
+    if if_none_match is not None and _matches(if_none_match, etag):
+        raise NotModified(etag)
+
+    response.headers["ETag"] = etag
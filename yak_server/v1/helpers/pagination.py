@@ -0,0 +1,18 @@
+import base64
+import binascii
+from uuid import UUID
+
+from yak_server.v1.helpers.errors import InvalidCursor
+
+
+def encode_cursor(points: float, user_id: UUID) -> str:
+    return base64.urlsafe_b64encode(f"{points!r}:{user_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, UUID]:
+    try:
+        points, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+
+        return float(points), UUID(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exception:
+        raise InvalidCursor from exception
@@ -8,6 +8,7 @@ from .phases import PhaseOut
 
 if TYPE_CHECKING:
     from yak_server.database.models import GroupModel
+    from yak_server.helpers.reference_data import Group
 
 
 class GroupIn(BaseModel):
@@ -20,7 +21,7 @@ class GroupOut(BaseModel):
     description: str
 
     @classmethod
-    def from_instance(cls, group: "GroupModel", *, lang: Lang) -> "GroupOut":
+    def from_instance(cls, group: "GroupModel | Group", *, lang: Lang) -> "GroupOut":
         return cls(id=group.id, code=group.code, description=get_language_description(group, lang))
 
 
@@ -35,7 +36,7 @@ class GroupWithPhaseIdOut(BaseModel):
     description: str
 
     @classmethod
-    def from_instance(cls, group: "GroupModel", *, lang: Lang) -> "GroupWithPhaseIdOut":
+    def from_instance(cls, group: "GroupModel | Group", *, lang: Lang) -> "GroupWithPhaseIdOut":
         return cls(
             id=group.id,
             code=group.code,
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class PoolMetricsOut(BaseModel):
+    name: str
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_max_ms: float
+    peak_checked_out: int
+    peak_overflow: int
+
+    model_config = ConfigDict(extra="forbid", from_attributes=True)
+
+
+class PasswordHashingMetricsOut(BaseModel):
+    workers: int
+    max_queue: int
+    running: int
+    queued: int
+    rejected: int
+
+    model_config = ConfigDict(extra="forbid", from_attributes=True)
+
+
+class PoolStatusResponse(BaseModel):
+    worker_pid: int
+    pools: list[PoolMetricsOut]
+    password_hashing: PasswordHashingMetricsOut
+
+    model_config = ConfigDict(extra="forbid")
@@ -6,6 +6,7 @@ from yak_server.helpers.language import Lang, get_language_description
 
 if TYPE_CHECKING:
     from yak_server.database.models import PhaseModel
+    from yak_server.helpers.reference_data import Phase
 
 
 class PhaseOut(BaseModel):
@@ -14,5 +15,5 @@ class PhaseOut(BaseModel):
     description: str
 
     @classmethod
-    def from_instance(cls, phase: "PhaseModel", *, lang: Lang) -> "PhaseOut":
+    def from_instance(cls, phase: "PhaseModel | Phase", *, lang: Lang) -> "PhaseOut":
         return cls(id=phase.id, code=phase.code, description=get_language_description(phase, lang))
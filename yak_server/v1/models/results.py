@@ -7,7 +7,7 @@ from yak_server.helpers.language import Lang
 from .groups import GroupOut
 
 if TYPE_CHECKING:
-    from yak_server.database.models import UserKnockoutGuessModel, UserModel
+    from yak_server.database.models import LeaderboardModel, UserKnockoutGuessModel, UserModel
 
 
 class KnockoutRoundResult(BaseModel):
@@ -50,6 +50,7 @@ class UserResult(BaseModel):
         *,
         rank: NonNegativeInt,
         number_of_players: NonNegativeInt,
+        points: float,
         lang: Lang,
     ) -> "UserResult":
         return cls(
@@ -67,7 +68,7 @@ class UserResult(BaseModel):
                 for kg in sorted(user.knockout_guesses, key=lambda kg: kg.group.index)
             ],
             number_winner_guess=user.number_winner_guess,
-            points=round(user.points, 2),
+            points=round(points, 2),
         )
 
 
@@ -85,9 +86,11 @@ class ScoreBoardUserResult(BaseModel):
     points: float
 
     @classmethod
-    def from_instance(cls, user: "UserModel", *, rank: NonNegativeInt) -> "ScoreBoardUserResult":
+    def from_instance(cls, leaderboard: "LeaderboardModel") -> "ScoreBoardUserResult":
+        user = leaderboard.user
+
         return cls(
-            rank=rank,
+            rank=leaderboard.rank,
             first_name=user.first_name,
             last_name=user.last_name,
             full_name=user.full_name,
@@ -96,14 +99,15 @@ class ScoreBoardUserResult(BaseModel):
             number_qualified_teams_guess=user.number_qualified_teams_guess,
             number_first_qualified_guess=user.number_first_qualified_guess,
             knockout_rounds=[
-                KnockoutRoundCount(group_id=kg.group_id, count=kg.count)
-                for kg in sorted(user.knockout_guesses, key=lambda kg: kg.group.index)
+                KnockoutRoundCount.model_validate(knockout_round)
+                for knockout_round in leaderboard.knockout_rounds
             ],
             number_winner_guess=user.number_winner_guess,
-            points=round(user.points, 2),
+            points=round(leaderboard.points, 2),
         )
 
 
 class ScoreBoardResponse(BaseModel):
     groups: list[GroupOut]
     results: list[ScoreBoardUserResult]
+    next_cursor: str | None = None
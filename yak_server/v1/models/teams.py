@@ -6,6 +6,7 @@ from yak_server.helpers.language import Lang, get_language_description
 
 if TYPE_CHECKING:
     from yak_server.database.models import TeamModel
+    from yak_server.helpers.reference_data import Team
 
 
 class FlagOut(BaseModel):
@@ -24,7 +25,7 @@ class TeamOut(BaseModel):
     flag: FlagOut
 
     @classmethod
-    def from_instance(cls, team: "TeamModel", *, lang: Lang) -> "TeamOut":
+    def from_instance(cls, team: "TeamModel | Team", *, lang: Lang) -> "TeamOut":
         return cls(
             id=team.id,
             code=team.code,
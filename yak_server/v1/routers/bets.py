@@ -1,26 +1,30 @@
 from datetime import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import UUID4
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
 from yak_server.database.models import (
     BinaryBetModel,
     GroupModel,
     MatchModel,
-    PhaseModel,
     ScoreBetModel,
-    UserModel,
 )
-from yak_server.database.query import bets_from_group_id, bets_from_phase_code
+from yak_server.database.query import bets_from_group, bets_from_phase
+from yak_server.helpers.authentication import Principal
 from yak_server.helpers.bet_locking import is_locked
-from yak_server.helpers.database import get_db
+from yak_server.helpers.database import get_async_db, get_read_db
 from yak_server.helpers.group_position import get_group_rank_with_code
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
 from yak_server.helpers.settings import get_lock_datetime
+from yak_server.helpers.version_counter import bets_version, get_version
 from yak_server.v1.helpers.auth import require_user
 from yak_server.v1.helpers.errors import GroupNotFound, PhaseNotFound
+from yak_server.v1.helpers.etag import check_etag, compute_etag
 from yak_server.v1.models.bets import (
     AllBetsResponse,
     BetsByGroupCodeResponse,
@@ -40,19 +44,36 @@ router = APIRouter(prefix="/bets", tags=["bets"])
 @router.get(
     "/",
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_all_bets(
-    user: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+async def retrieve_all_bets(
+    request: Request,
+    response: Response,
+    user: Annotated[Principal, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[AllBetsResponse]:
-    score_bets = (
-        db
-        .query(ScoreBetModel)
+    locked = is_locked(user, lock_datetime)
+
+    check_etag(
+        request,
+        response,
+        compute_etag(
+            user.id,
+            await db.run_sync(get_version, bets_version(user.id)),
+            locked,
+            lang,
+            reference_data.version,
+        ),
+    )
+
+    score_bets = await db.scalars(
+        select(ScoreBetModel)
         .options(
             selectinload(ScoreBetModel.match).selectinload(MatchModel.team1),
             selectinload(ScoreBetModel.match).selectinload(MatchModel.team2),
@@ -63,9 +84,8 @@ def retrieve_all_bets(
         .order_by(GroupModel.index, MatchModel.index)
     )
 
-    binary_bets = (
-        db
-        .query(BinaryBetModel)
+    binary_bets = await db.scalars(
+        select(BinaryBetModel)
         .options(
             selectinload(BinaryBetModel.match).selectinload(MatchModel.team1),
             selectinload(BinaryBetModel.match).selectinload(MatchModel.team2),
@@ -76,27 +96,19 @@ def retrieve_all_bets(
         .order_by(GroupModel.index, MatchModel.index)
     )
 
-    groups = db.query(GroupModel).order_by(GroupModel.index)
-    phases = db.query(PhaseModel).order_by(PhaseModel.index)
-
     return GenericOut(
         result=AllBetsResponse(
-            phases=[PhaseOut.from_instance(phase, lang=lang) for phase in phases],
-            groups=[GroupWithPhaseIdOut.from_instance(group, lang=lang) for group in groups],
+            phases=[PhaseOut.from_instance(phase, lang=lang) for phase in reference_data.phases],
+            groups=[
+                GroupWithPhaseIdOut.from_instance(group, lang=lang)
+                for group in reference_data.groups
+            ],
             score_bets=[
-                ScoreBetWithGroupIdOut.from_instance(
-                    score_bet,
-                    locked=is_locked(user, lock_datetime),
-                    lang=lang,
-                )
+                ScoreBetWithGroupIdOut.from_instance(score_bet, locked=locked, lang=lang)
                 for score_bet in score_bets
             ],
             binary_bets=[
-                BinaryBetWithGroupIdOut.from_instance(
-                    binary_bet,
-                    locked=is_locked(user, lock_datetime),
-                    lang=lang,
-                )
+                BinaryBetWithGroupIdOut.from_instance(binary_bet, locked=locked, lang=lang)
                 for binary_bet in binary_bets
             ],
         ),
@@ -111,22 +123,31 @@ def retrieve_all_bets(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_bets_by_phase_code(
+async def retrieve_bets_by_phase_code(
     phase_code: str,
-    user: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[Principal, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[BetsByPhaseCodeResponse]:
-    phase, groups, score_bets, binary_bets = bets_from_phase_code(db, user, phase_code)
+    phase = reference_data.phases_by_code.get(phase_code)
 
     if not phase:
         raise PhaseNotFound(phase_code)
 
+    score_bets_query, binary_bets_query = bets_from_phase(user, phase)
+
+    score_bets = await db.scalars(score_bets_query)
+    binary_bets = await db.scalars(binary_bets_query)
+
     return GenericOut(
         result=BetsByPhaseCodeResponse(
             phase=PhaseOut.from_instance(phase, lang=lang),
-            groups=[GroupOut.from_instance(group, lang=lang) for group in groups],
+            groups=[
+                GroupOut.from_instance(group, lang=lang)
+                for group in reference_data.groups_by_phase_id[phase.id]
+            ],
             score_bets=[
                 ScoreBetWithGroupIdOut.from_instance(
                     score_bet,
@@ -155,21 +176,27 @@ def retrieve_bets_by_phase_code(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_bets_by_group_code(
+async def retrieve_bets_by_group_code(
     group_id: UUID4,
-    user: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[Principal, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[BetsByGroupCodeResponse]:
-    group, score_bets, binary_bets = bets_from_group_id(db, user, group_id)
+    group = reference_data.groups_by_id.get(group_id)
 
     if group is None:
         raise GroupNotFound(group_id)
 
+    score_bets_query, binary_bets_query = bets_from_group(user, group)
+
+    score_bets = await db.scalars(score_bets_query)
+    binary_bets = await db.scalars(binary_bets_query)
+
     return GenericOut(
         result=BetsByGroupCodeResponse(
-            phase=PhaseOut.from_instance(group.phase, lang=lang),
+            phase=PhaseOut.from_instance(reference_data.phases_by_id[group.phase_id], lang=lang),
             group=GroupOut.from_instance(group, lang=lang),
             score_bets=[
                 ScoreBetOut.from_instance(
@@ -199,30 +226,29 @@ def retrieve_bets_by_group_code(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_group_rank_by_code(
+async def retrieve_group_rank_by_code(
     group_id: UUID4,
-    user: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    user: Annotated[Principal, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[GroupRankResponse]:
-    group = (
-        db.query(GroupModel).options(selectinload(GroupModel.phase)).filter_by(id=group_id).first()
-    )
+    group = reference_data.groups_by_id.get(group_id)
 
     if group is None:
         raise GroupNotFound(group_id)
 
-    group_rank = get_group_rank_with_code(db, user, group.id)
-
-    db.refresh(group)
+    def group_rank_out(db: Session) -> list[GroupPositionOut]:
+        # Rank may be recomputed and committed, which expires the loaded teams
+        return [
+            GroupPositionOut.from_instance(group_position, lang=lang)
+            for group_position in get_group_rank_with_code(db, user, group.id)
+        ]
 
     return GenericOut(
         result=GroupRankResponse(
-            phase=PhaseOut.from_instance(group.phase, lang=lang),
+            phase=PhaseOut.from_instance(reference_data.phases_by_id[group.phase_id], lang=lang),
             group=GroupOut.from_instance(group, lang=lang),
-            group_rank=[
-                GroupPositionOut.from_instance(group_position, lang=lang)
-                for group_position in group_rank
-            ],
+            group_rank=await db.run_sync(group_rank_out),
         ),
     )
@@ -5,14 +5,18 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, status
 from pydantic import UUID4
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from yak_server.database.models import BinaryBetModel, GroupModel, MatchModel, UserModel
+from yak_server.database.models import BinaryBetModel
+from yak_server.database.query import binary_bet_from_id
+from yak_server.helpers.authentication import Principal
 from yak_server.helpers.bet_locking import is_locked
-from yak_server.helpers.database import get_db
+from yak_server.helpers.database import get_async_db
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang, get_language_description
 from yak_server.helpers.logging_helpers import modify_binary_bet_successfully
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
 from yak_server.helpers.settings import get_lock_datetime
+from yak_server.helpers.version_counter import bets_version, bump_version
 from yak_server.v1.helpers.auth import require_user
 from yak_server.v1.helpers.errors import BetNotFound, LockedBinaryBet, TeamNotFound
 from yak_server.v1.models.binary_bets import BinaryBetOut, BinaryBetResponse, ModifyBinaryBetIn
@@ -29,36 +33,49 @@ router = APIRouter(prefix="/binary_bets", tags=["binary_bets"])
 def send_response(
     binary_bet: BinaryBetModel,
     *,
+    reference_data: ReferenceData,
     locked: bool,
     lang: Lang,
 ) -> GenericOut[BinaryBetResponse]:
+    group = reference_data.groups_by_id[binary_bet.match.group_id]
+    team1 = (
+        reference_data.teams_by_id[binary_bet.match.team1_id]
+        if binary_bet.match.team1_id is not None
+        else None
+    )
+    team2 = (
+        reference_data.teams_by_id[binary_bet.match.team2_id]
+        if binary_bet.match.team2_id is not None
+        else None
+    )
+
     return GenericOut(
         result=BinaryBetResponse(
-            phase=PhaseOut.from_instance(binary_bet.match.group.phase, lang=lang),
-            group=GroupOut.from_instance(binary_bet.match.group, lang=lang),
+            phase=PhaseOut.from_instance(reference_data.phases_by_id[group.phase_id], lang=lang),
+            group=GroupOut.from_instance(group, lang=lang),
             binary_bet=BinaryBetOut(
                 id=binary_bet.id,
                 locked=locked,
                 team1=(
                     TeamWithWonOut(
-                        id=binary_bet.match.team1.id,
-                        code=binary_bet.match.team1.code,
-                        description=get_language_description(binary_bet.match.team1, lang),
-                        flag=FlagOut(url=f"/api/v1/teams/{binary_bet.match.team1.id}/flag"),
+                        id=team1.id,
+                        code=team1.code,
+                        description=get_language_description(team1, lang),
+                        flag=FlagOut(url=f"/api/v1/teams/{team1.id}/flag"),
                         won=binary_bet.bet_from_is_one_won()[0],
                     )
-                    if binary_bet.match.team1 is not None
+                    if team1 is not None
                     else None
                 ),
                 team2=(
                     TeamWithWonOut(
-                        id=binary_bet.match.team2.id,
-                        code=binary_bet.match.team2.code,
-                        description=get_language_description(binary_bet.match.team2, lang),
-                        flag=FlagOut(url=f"/api/v1/teams/{binary_bet.match.team2.id}/flag"),
+                        id=team2.id,
+                        code=team2.code,
+                        description=get_language_description(team2, lang),
+                        flag=FlagOut(url=f"/api/v1/teams/{team2.id}/flag"),
                         won=binary_bet.bet_from_is_one_won()[1],
                     )
-                    if binary_bet.match.team2 is not None
+                    if team2 is not None
                     else None
                 ),
             ),
@@ -74,33 +91,25 @@ def send_response(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_binary_bet_by_id(
+async def retrieve_binary_bet_by_id(
     bet_id: UUID4,
-    db: Annotated[Session, Depends(get_db)],
-    user: Annotated[UserModel, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: Annotated[Principal, Depends(require_user)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[BinaryBetResponse]:
-    binary_bet = (
-        db
-        .query(BinaryBetModel)
-        .options(
-            selectinload(BinaryBetModel.match)
-            .selectinload(MatchModel.group)
-            .selectinload(GroupModel.phase),
-            selectinload(BinaryBetModel.match).selectinload(MatchModel.group),
-            selectinload(BinaryBetModel.match).selectinload(MatchModel.team1),
-            selectinload(BinaryBetModel.match).selectinload(MatchModel.team2),
-        )
-        .join(BinaryBetModel.match)
-        .where(MatchModel.user_id == user.id, BinaryBetModel.id == bet_id)
-        .first()
-    )
+    binary_bet: BinaryBetModel | None = await db.scalar(binary_bet_from_id(user.id, bet_id))
 
     if not binary_bet:
         raise BetNotFound(bet_id)
 
-    return send_response(binary_bet, locked=is_locked(user, lock_datetime), lang=lang)
+    return send_response(
+        binary_bet,
+        reference_data=reference_data,
+        locked=is_locked(user, lock_datetime),
+        lang=lang,
+    )
 
 
 @router.patch(
@@ -111,32 +120,19 @@ def retrieve_binary_bet_by_id(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def modify_binary_bet_by_id(
+async def modify_binary_bet_by_id(
     bet_id: UUID4,
     modify_binary_bet_in: ModifyBinaryBetIn,
-    db: Annotated[Session, Depends(get_db)],
-    user: Annotated[UserModel, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: Annotated[Principal, Depends(require_user)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[BinaryBetResponse]:
     if is_locked(user, lock_datetime):
         raise LockedBinaryBet
 
-    binary_bet = (
-        db
-        .query(BinaryBetModel)
-        .options(
-            selectinload(BinaryBetModel.match)
-            .selectinload(MatchModel.group)
-            .selectinload(GroupModel.phase),
-            selectinload(BinaryBetModel.match).selectinload(MatchModel.group),
-            selectinload(BinaryBetModel.match).selectinload(MatchModel.team1),
-            selectinload(BinaryBetModel.match).selectinload(MatchModel.team2),
-        )
-        .join(BinaryBetModel.match)
-        .where(MatchModel.user_id == user.id, BinaryBetModel.id == bet_id)
-        .first()
-    )
+    binary_bet: BinaryBetModel | None = await db.scalar(binary_bet_from_id(user.id, bet_id))
 
     if not binary_bet:
         raise BetNotFound(bet_id)
@@ -146,6 +142,7 @@ def modify_binary_bet_by_id(
             user.name,
             binary_bet,
             new_is_one_won=modify_binary_bet_in.is_one_won,
+            reference_data=reference_data,
         ),
     )
 
@@ -159,9 +156,9 @@ def modify_binary_bet_by_id(
         binary_bet.match.team1_id = modify_binary_bet_in.team1.id
 
         try:
-            db.flush()
+            await db.flush()
         except IntegrityError as integrity_error:
-            db.rollback()
+            await db.rollback()
             # team1.id is not None due to: "id" in modify_binary_bet_in.team1.model_fields_set
             # being true
             raise TeamNotFound(modify_binary_bet_in.team1.id) from integrity_error  # type: ignore[arg-type]
@@ -173,14 +170,20 @@ def modify_binary_bet_by_id(
         binary_bet.match.team2_id = modify_binary_bet_in.team2.id
 
         try:
-            db.flush()
+            await db.flush()
         except IntegrityError as integrity_error:
-            db.rollback()
+            await db.rollback()
             # team2.id is not None due to: "id" in modify_binary_bet_in.team2.model_fields_set
             # being true
             raise TeamNotFound(modify_binary_bet_in.team2.id) from integrity_error  # type: ignore[arg-type]
 
-    db.commit()
-    db.refresh(binary_bet)
+    await db.run_sync(bump_version, bets_version(user.id))
 
-    return send_response(binary_bet, locked=is_locked(user, lock_datetime), lang=lang)
+    await db.commit()
+
+    return send_response(
+        binary_bet,
+        reference_data=reference_data,
+        locked=is_locked(user, lock_datetime),
+        lang=lang,
+    )
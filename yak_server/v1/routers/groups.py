@@ -1,14 +1,14 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import UUID4
-from sqlalchemy.orm import Session, selectinload
 
-from yak_server.database.models import GroupModel, PhaseModel, UserModel
-from yak_server.helpers.database import get_db
+from yak_server.helpers.authentication import Principal
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
 from yak_server.v1.helpers.auth import require_user
 from yak_server.v1.helpers.errors import GroupNotFound, PhaseNotFound
+from yak_server.v1.helpers.etag import check_etag, compute_etag
 from yak_server.v1.models.generic import ErrorOut, GenericOut, ValidationErrorOut
 from yak_server.v1.models.groups import (
     AllGroupsResponse,
@@ -25,22 +25,27 @@ router = APIRouter(prefix="/groups", tags=["groups"])
 @router.get(
     "/",
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
 def retrieve_all_groups(
-    _: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    request: Request,
+    response: Response,
+    _: Annotated[Principal, Depends(require_user)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[AllGroupsResponse]:
-    groups = db.query(GroupModel).order_by(GroupModel.index)
-    phases = db.query(PhaseModel).order_by(PhaseModel.index)
+    check_etag(request, response, compute_etag(reference_data.version, lang))
 
     return GenericOut(
         result=AllGroupsResponse(
-            phases=[PhaseOut.from_instance(phase, lang=lang) for phase in phases],
-            groups=[GroupWithPhaseIdOut.from_instance(group, lang=lang) for group in groups],
+            phases=[PhaseOut.from_instance(phase, lang=lang) for phase in reference_data.phases],
+            groups=[
+                GroupWithPhaseIdOut.from_instance(group, lang=lang)
+                for group in reference_data.groups
+            ],
         ),
     )
 
@@ -55,20 +60,18 @@ def retrieve_all_groups(
 )
 def retrieve_group_by_id(
     group_id: UUID4,
-    _: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[Principal, Depends(require_user)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[GroupResponse]:
-    group = (
-        db.query(GroupModel).options(selectinload(GroupModel.phase)).filter_by(id=group_id).first()
-    )
+    group = reference_data.groups_by_id.get(group_id)
 
     if group is None:
         raise GroupNotFound(group_id)
 
     return GenericOut(
         result=GroupResponse(
-            phase=PhaseOut.from_instance(group.phase, lang=lang),
+            phase=PhaseOut.from_instance(reference_data.phases_by_id[group.phase_id], lang=lang),
             group=GroupOut.from_instance(group, lang=lang),
         ),
     )
@@ -84,20 +87,21 @@ def retrieve_group_by_id(
 )
 def retrieve_groups_by_phase_code(
     phase_code: str,
-    _: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[Principal, Depends(require_user)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[GroupsByPhaseCodeResponse]:
-    phase = db.query(PhaseModel).filter_by(code=phase_code).first()
+    phase = reference_data.phases_by_code.get(phase_code)
 
     if not phase:
         raise PhaseNotFound(phase_code)
 
-    groups = db.query(GroupModel).order_by(GroupModel.index).filter_by(phase_id=phase.id)
-
     return GenericOut(
         result=GroupsByPhaseCodeResponse(
             phase=PhaseOut.from_instance(phase, lang=lang),
-            groups=[GroupOut.from_instance(group, lang=lang) for group in groups],
+            groups=[
+                GroupOut.from_instance(group, lang=lang)
+                for group in reference_data.groups_by_phase_id[phase.id]
+            ],
         ),
     )
@@ -2,11 +2,10 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
 from pydantic import UUID4
-from sqlalchemy.orm import Session
 
-from yak_server.database.models import PhaseModel, UserModel
-from yak_server.helpers.database import get_db
+from yak_server.helpers.authentication import Principal
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
 from yak_server.v1.helpers.auth import require_user
 from yak_server.v1.helpers.errors import PhaseNotFound
 from yak_server.v1.models.generic import ErrorOut, GenericOut, ValidationErrorOut
@@ -23,15 +22,12 @@ router = APIRouter(prefix="/phases", tags=["phases"])
     },
 )
 def retrieve_all_phases(
-    _: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[Principal, Depends(require_user)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[list[PhaseOut]]:
     return GenericOut(
-        result=[
-            PhaseOut.from_instance(phase, lang=lang)
-            for phase in db.query(PhaseModel).order_by(PhaseModel.index)
-        ],
+        result=[PhaseOut.from_instance(phase, lang=lang) for phase in reference_data.phases],
     )
 
 
@@ -45,11 +41,11 @@ def retrieve_all_phases(
 )
 def retrieve_phase(
     phase_id: UUID4,
-    _: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+    _: Annotated[Principal, Depends(require_user)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[PhaseOut]:
-    phase = db.query(PhaseModel).filter_by(id=phase_id).first()
+    phase = reference_data.phases_by_id.get(phase_id)
 
     if not phase:
         raise PhaseNotFound(phase_id)
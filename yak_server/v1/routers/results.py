@@ -1,113 +1,183 @@
-from typing import TYPE_CHECKING, Annotated
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
-from yak_server.database.models import GroupModel, Role, UserKnockoutGuessModel, UserModel
-from yak_server.helpers.database import get_db
+from yak_server.database.models import (
+    GroupModel,
+    LeaderboardModel,
+    UserKnockoutGuessModel,
+    UserModel,
+)
+from yak_server.helpers.authentication import Principal
+from yak_server.helpers.database import get_async_db, get_read_db
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang
-from yak_server.v1.helpers.auth import require_user
+from yak_server.helpers.leaderboard import count_players
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
+from yak_server.helpers.version_counter import SCORE_BOARD_VERSION, get_version
+from yak_server.v1.helpers.auth import load_user, require_user
+from yak_server.v1.helpers.etag import check_etag, compute_etag
+from yak_server.v1.helpers.pagination import decode_cursor, encode_cursor
 from yak_server.v1.models.generic import ErrorOut, GenericOut, ValidationErrorOut
 from yak_server.v1.models.groups import GroupOut
 from yak_server.v1.models.results import ScoreBoardResponse, ScoreBoardUserResult, UserResult
 
-if TYPE_CHECKING:
-    from collections.abc import Sequence
+router = APIRouter(tags=["results"])
+
 
+async def score_board_page(
+    db: AsyncSession,
+    leaderboard: Select[tuple[LeaderboardModel]],
+    *,
+    limit: int | None,
+    cursor: str | None,
+) -> tuple[list[LeaderboardModel], str | None]:
+    leaderboard = leaderboard.order_by(LeaderboardModel.points.desc(), LeaderboardModel.user_id)
 
-router = APIRouter(tags=["results"])
+    if cursor is not None:
+        points, user_id = decode_cursor(cursor)
+
+        # Keyset on (points DESC, user_id), the first condition lets it use the index
+        leaderboard = leaderboard.where(
+            LeaderboardModel.points <= points,
+            or_(LeaderboardModel.points < points, LeaderboardModel.user_id > user_id),
+        )
+
+    if limit is None:
+        return list((await db.scalars(leaderboard)).all()), None
+
+    entries = list((await db.scalars(leaderboard.limit(limit + 1))).all())
+
+    if len(entries) <= limit:
+        return entries, None
+
+    entries = entries[:limit]
+
+    return entries, encode_cursor(entries[-1].points, entries[-1].user_id)
+
+
+async def score_board_around(
+    db: AsyncSession,
+    leaderboard: Select[tuple[LeaderboardModel]],
+    *,
+    user_id: UUID,
+    around: int,
+) -> list[LeaderboardModel]:
+    user_rank = (
+        select(LeaderboardModel.rank).where(LeaderboardModel.user_id == user_id).scalar_subquery()
+    )
+
+    entries = await db.scalars(
+        leaderboard.where(
+            LeaderboardModel.rank.between(user_rank - around, user_rank + around)
+        ).order_by(LeaderboardModel.rank)
+    )
+
+    return list(entries.all())
 
 
 @router.get(
     "/score_board",
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorOut},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_score_board(
-    _: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+async def retrieve_score_board(  # ruff:ignore[too-many-arguments, too-many-positional-arguments]
+    request: Request,
+    response: Response,
+    user: Annotated[Principal, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
+    limit: Annotated[int | None, Query(gt=0, description="Maximum number of players")] = None,
+    cursor: Annotated[str | None, Query(description="next_cursor of the previous page")] = None,
+    around: Annotated[
+        int | None,
+        Query(ge=0, description="Players above and below the current user, ignores pagination"),
+    ] = None,
 ) -> GenericOut[ScoreBoardResponse]:
-    knockout_groups = (
-        db
-        .query(GroupModel)
+    check_etag(
+        request,
+        response,
+        compute_etag(
+            await db.run_sync(get_version, SCORE_BOARD_VERSION),
+            # Only the window around the current user depends on who is asking
+            user.id if around is not None else None,
+            limit,
+            cursor,
+            around,
+            lang,
+            reference_data.version,
+        ),
+    )
+
+    knockout_groups = await db.scalars(
+        select(GroupModel)
         .where(GroupModel.id.in_(select(UserKnockoutGuessModel.group_id).distinct()))
         .order_by(GroupModel.index)
-        .all()
     )
 
-    users = list(
-        db
-        .query(UserModel)
-        .options(
-            selectinload(UserModel.knockout_guesses).selectinload(UserKnockoutGuessModel.group)
-        )
-        .order_by(UserModel.points.desc())
-        .where(UserModel.role != Role.ADMIN)
-    )
+    leaderboard = select(LeaderboardModel).options(joinedload(LeaderboardModel.user))
+
+    if around is None:
+        entries, next_cursor = await score_board_page(db, leaderboard, limit=limit, cursor=cursor)
+    else:
+        entries = await score_board_around(db, leaderboard, user_id=user.id, around=around)
+        next_cursor = None
 
     return GenericOut(
         result=ScoreBoardResponse(
             groups=[GroupOut.from_instance(g, lang=lang) for g in knockout_groups],
-            results=[
-                ScoreBoardUserResult.from_instance(user, rank=rank)
-                for rank, user in enumerate(users, 1)
-            ],
+            results=[ScoreBoardUserResult.from_instance(entry) for entry in entries],
+            next_cursor=next_cursor,
         )
     )
 
 
-def compute_rank(db: Session, user_id: UUID) -> int:
-    subq = (
-        db
-        .query(
-            UserModel,
-            func.row_number().over(order_by=UserModel.points.desc()).label("rownum"),
-        )
-        .where(UserModel.role != Role.ADMIN)
-        .subquery()
-    )
-
-    rank: Sequence[int] = db.query(subq.c.rownum).where(subq.c.id == user_id).first()
-
-    if not rank:
-        return 0
-
-    return rank[0]
-
-
 @router.get(
     "/results",
     responses={
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
+        status.HTTP_404_NOT_FOUND: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_user_results(
-    user: Annotated[UserModel, Depends(require_user)],
-    db: Annotated[Session, Depends(get_db)],
+async def retrieve_user_results(
+    user: Annotated[Principal, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[UserResult]:
-    rank = compute_rank(db, user.id)
+    leaderboard = await db.get(LeaderboardModel, user.id)
 
-    user_with_guesses = (
-        db
-        .query(UserModel)
-        .options(
-            selectinload(UserModel.knockout_guesses).selectinload(UserKnockoutGuessModel.group)
-        )
-        .filter_by(id=user.id)
-        .one()
+    user_with_guesses = await db.run_sync(
+        load_user,
+        user,
+        selectinload(UserModel.knockout_guesses).selectinload(UserKnockoutGuessModel.group),
     )
 
-    number_of_players = db.query(func.count(UserModel.id)).where(UserModel.name != "admin").scalar()
+    number_of_players = await db.run_sync(count_players)
+
+    if leaderboard is None:
+        # Admin user is not ranked
+        rank = 0
+        points = user_with_guesses.points
+    else:
+        # Rank and points come from the same snapshot
+        rank = leaderboard.rank
+        points = leaderboard.points
 
     return GenericOut(
         result=UserResult.from_instance(
-            user_with_guesses, rank=rank, number_of_players=number_of_players, lang=lang
+            user_with_guesses,
+            rank=rank,
+            number_of_players=number_of_players,
+            points=points,
+            lang=lang,
         )
     )
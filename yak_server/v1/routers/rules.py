@@ -1,15 +1,17 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
-from yak_server.database.models import Role, UserModel
+from yak_server.database.models import Role
+from yak_server.helpers.authentication import Principal
 from yak_server.helpers.database import get_db
 from yak_server.helpers.rules import RULE_MAPPING, Rules
 from yak_server.helpers.settings import get_rules
-from yak_server.v1.helpers.auth import require_user
+from yak_server.v1.helpers.auth import load_user, require_user
 from yak_server.v1.helpers.errors import RuleNotFound, UnauthorizedAccessToAdminAPI
+from yak_server.v1.helpers.etag import check_etag, compute_etag
 from yak_server.v1.models.generic import ErrorOut, GenericOut, ValidationErrorOut
 
 router = APIRouter(prefix="/rules", tags=["rules"])
@@ -26,7 +28,7 @@ router = APIRouter(prefix="/rules", tags=["rules"])
 def execute_rule(
     rule_id: UUID4,
     db: Annotated[Session, Depends(get_db)],
-    user: Annotated[UserModel, Depends(require_user)],
+    user: Annotated[Principal, Depends(require_user)],
     rules: Annotated[Rules, Depends(get_rules)],
 ) -> GenericOut[str]:
     rule_metadata = RULE_MAPPING.get(rule_id)
@@ -37,7 +39,7 @@ def execute_rule(
     if rule_metadata.required_admin is True and user.role != Role.ADMIN:
         raise UnauthorizedAccessToAdminAPI
 
-    rule_metadata.function(db, user, getattr(rules, rule_metadata.attribute))
+    rule_metadata.function(db, load_user(db, user), getattr(rules, rule_metadata.attribute))
 
     return GenericOut(result="")
 
@@ -45,12 +47,18 @@ def execute_rule(
 @router.get(
     "",
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
         status.HTTP_404_NOT_FOUND: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
 def retrieve_rules_configuration(
-    _: Annotated[UserModel, Depends(require_user)], rules: Annotated[Rules, Depends(get_rules)]
+    request: Request,
+    response: Response,
+    _: Annotated[Principal, Depends(require_user)],
+    rules: Annotated[Rules, Depends(get_rules)],
 ) -> GenericOut[Rules]:
+    check_etag(request, response, compute_etag(rules.model_dump_json()))
+
     return GenericOut(result=rules)
@@ -1,19 +1,25 @@
 import logging
 from datetime import datetime
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 from fastapi import APIRouter, Depends, status
 from pydantic import UUID4
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from yak_server.database.models import GroupModel, MatchModel, ScoreBetModel, UserModel
+from yak_server.database.models import Role, ScoreBetModel
+from yak_server.database.query import score_bet_from_id, score_bets_to_modify
+from yak_server.helpers.authentication import Principal
 from yak_server.helpers.bet_locking import is_locked
-from yak_server.helpers.database import get_db
+from yak_server.helpers.database import get_async_db
 from yak_server.helpers.group_position import set_recomputation_flag
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang, get_language_description
 from yak_server.helpers.logging_helpers import modify_score_bet_successfully
-from yak_server.helpers.settings import get_lock_datetime
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
+from yak_server.helpers.rules import Rules
+from yak_server.helpers.rules.compute_points import compute_points_for_matches
+from yak_server.helpers.settings import get_lock_datetime, get_rules
+from yak_server.helpers.version_counter import bets_version, bump_version
 from yak_server.v1.helpers.auth import require_user
 from yak_server.v1.helpers.errors import BetNotFound, LockedScoreBet, TeamNotFound
 from yak_server.v1.models.generic import ErrorOut, GenericOut, ValidationErrorOut
@@ -27,6 +33,9 @@ from yak_server.v1.models.score_bets import (
 )
 from yak_server.v1.models.teams import FlagOut, TeamWithScoreOut
 
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/score_bets", tags=["score_bets"])
@@ -35,36 +44,49 @@ router = APIRouter(prefix="/score_bets", tags=["score_bets"])
 def send_response(
     score_bet: ScoreBetModel,
     *,
+    reference_data: ReferenceData,
     locked: bool,
     lang: Lang,
 ) -> GenericOut[ScoreBetResponse]:
+    group = reference_data.groups_by_id[score_bet.match.group_id]
+    team1 = (
+        reference_data.teams_by_id[score_bet.match.team1_id]
+        if score_bet.match.team1_id is not None
+        else None
+    )
+    team2 = (
+        reference_data.teams_by_id[score_bet.match.team2_id]
+        if score_bet.match.team2_id is not None
+        else None
+    )
+
     return GenericOut(
         result=ScoreBetResponse(
-            phase=PhaseOut.from_instance(score_bet.match.group.phase, lang=lang),
-            group=GroupOut.from_instance(score_bet.match.group, lang=lang),
+            phase=PhaseOut.from_instance(reference_data.phases_by_id[group.phase_id], lang=lang),
+            group=GroupOut.from_instance(group, lang=lang),
             score_bet=ScoreBetOut(
                 id=score_bet.id,
                 locked=locked,
                 team1=(
                     TeamWithScoreOut(
-                        id=score_bet.match.team1.id,
-                        code=score_bet.match.team1.code,
-                        description=get_language_description(score_bet.match.team1, lang),
-                        flag=FlagOut(url=f"/api/v1/teams/{score_bet.match.team1.id}/flag"),
+                        id=team1.id,
+                        code=team1.code,
+                        description=get_language_description(team1, lang),
+                        flag=FlagOut(url=f"/api/v1/teams/{team1.id}/flag"),
                         score=score_bet.score1,
                     )
-                    if score_bet.match.team1 is not None
+                    if team1 is not None
                     else None
                 ),
                 team2=(
                     TeamWithScoreOut(
-                        id=score_bet.match.team2.id,
-                        code=score_bet.match.team2.code,
-                        description=get_language_description(score_bet.match.team2, lang),
-                        flag=FlagOut(url=f"/api/v1/teams/{score_bet.match.team2.id}/flag"),
+                        id=team2.id,
+                        code=team2.code,
+                        description=get_language_description(team2, lang),
+                        flag=FlagOut(url=f"/api/v1/teams/{team2.id}/flag"),
                         score=score_bet.score2,
                     )
-                    if score_bet.match.team2 is not None
+                    if team2 is not None
                     else None
                 ),
             ),
@@ -80,11 +102,13 @@ def send_response(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def bulk_modify_score_bets(  # ruff:ignore[complex-structure]
+async def bulk_modify_score_bets(  # ruff:ignore[complex-structure]
     score_bets_in: list[BulkModifyScoreBetItem],
-    db: Annotated[Session, Depends(get_db)],
-    user: Annotated[UserModel, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: Annotated[Principal, Depends(require_user)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    rules: Annotated[Rules, Depends(get_rules)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[list[ScoreBetResponse]]:
     if is_locked(user, lock_datetime):
@@ -92,21 +116,9 @@ def bulk_modify_score_bets(  # ruff:ignore[complex-structure]
 
     requested_ids = [item.id for item in score_bets_in]
 
-    score_bets = (
-        db
-        .query(ScoreBetModel)
-        .options(
-            selectinload(ScoreBetModel.match)
-            .selectinload(MatchModel.group)
-            .selectinload(GroupModel.phase),
-            selectinload(ScoreBetModel.match).selectinload(MatchModel.team1),
-            selectinload(ScoreBetModel.match).selectinload(MatchModel.team2),
-        )
-        .join(ScoreBetModel.match)
-        .where(MatchModel.user_id == user.id, ScoreBetModel.id.in_(requested_ids))
-        .with_for_update()
-        .all()
-    )
+    score_bets: Sequence[ScoreBetModel] = (
+        await db.scalars(score_bets_to_modify(user.id, requested_ids))
+    ).all()
 
     score_bets_by_id = {sb.id: sb for sb in score_bets}
     missing = [rid for rid in requested_ids if rid not in score_bets_by_id]
@@ -124,6 +136,7 @@ def bulk_modify_score_bets(  # ruff:ignore[complex-structure]
                 score_bet,
                 item.team1.score if item.team1 else None,
                 item.team2.score if item.team2 else None,
+                reference_data=reference_data,
             ),
         )
 
@@ -143,22 +156,37 @@ def bulk_modify_score_bets(  # ruff:ignore[complex-structure]
         team_ids.add(score_bet.match.team2_id)
 
     try:
-        db.flush()
+        await db.flush()
     except IntegrityError as integrity_error:
-        db.rollback()
+        await db.rollback()
         raise BetNotFound(score_bets_in[0].id) from integrity_error
 
     for team_id in team_ids:
-        set_recomputation_flag(db, team_id, user.id)
+        await db.run_sync(set_recomputation_flag, team_id, user.id)
+
+    if user.role == Role.ADMIN and rules.compute_points is not None:
+        await db.flush()
+
+        await db.run_sync(
+            compute_points_for_matches,
+            user,
+            rules.compute_points,
+            [score_bet.match for score_bet in score_bets],
+        )
+
+    await db.run_sync(bump_version, bets_version(user.id))
 
-    db.commit()
-    for score_bet in score_bets:
-        db.refresh(score_bet)
+    await db.commit()
 
     locked = is_locked(user, lock_datetime)
     return GenericOut(
         result=[
-            send_response(score_bets_by_id[rid], locked=locked, lang=lang).result
+            send_response(
+                score_bets_by_id[rid],
+                reference_data=reference_data,
+                locked=locked,
+                lang=lang,
+            ).result
             for rid in requested_ids
         ],
     )
@@ -172,32 +200,25 @@ def bulk_modify_score_bets(  # ruff:ignore[complex-structure]
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def retrieve_score_bet_by_id(
+async def retrieve_score_bet_by_id(
     bet_id: UUID4,
-    db: Annotated[Session, Depends(get_db)],
-    user: Annotated[UserModel, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: Annotated[Principal, Depends(require_user)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[ScoreBetResponse]:
-    score_bet = (
-        db
-        .query(ScoreBetModel)
-        .options(
-            selectinload(ScoreBetModel.match)
-            .selectinload(MatchModel.group)
-            .selectinload(GroupModel.phase),
-            selectinload(ScoreBetModel.match).selectinload(MatchModel.team1),
-            selectinload(ScoreBetModel.match).selectinload(MatchModel.team2),
-        )
-        .join(ScoreBetModel.match)
-        .where(MatchModel.user_id == user.id, ScoreBetModel.id == bet_id)
-        .first()
-    )
+    score_bet: ScoreBetModel | None = await db.scalar(score_bet_from_id(user.id, bet_id))
 
     if not score_bet:
         raise BetNotFound(bet_id)
 
-    return send_response(score_bet, locked=is_locked(user, lock_datetime), lang=lang)
+    return send_response(
+        score_bet,
+        reference_data=reference_data,
+        locked=is_locked(user, lock_datetime),
+        lang=lang,
+    )
 
 
 @router.patch(
@@ -208,32 +229,20 @@ def retrieve_score_bet_by_id(
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
-def modify_score_bet(
+async def modify_score_bet(  # ruff:ignore[too-many-arguments, too-many-positional-arguments]
     bet_id: UUID4,
     modify_score_bet_in: ModifyScoreBetIn,
-    db: Annotated[Session, Depends(get_db)],
-    user: Annotated[UserModel, Depends(require_user)],
+    db: Annotated[AsyncSession, Depends(get_async_db)],
+    user: Annotated[Principal, Depends(require_user)],
     lock_datetime: Annotated[datetime, Depends(get_lock_datetime)],
+    rules: Annotated[Rules, Depends(get_rules)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[ScoreBetResponse]:
     if is_locked(user, lock_datetime):
         raise LockedScoreBet
 
-    score_bet = (
-        db
-        .query(ScoreBetModel)
-        .options(
-            selectinload(ScoreBetModel.match)
-            .selectinload(MatchModel.group)
-            .selectinload(GroupModel.phase),
-            selectinload(ScoreBetModel.match).selectinload(MatchModel.team1),
-            selectinload(ScoreBetModel.match).selectinload(MatchModel.team2),
-        )
-        .join(ScoreBetModel.match)
-        .where(MatchModel.user_id == user.id, ScoreBetModel.id == bet_id)
-        .with_for_update()
-        .first()
-    )
+    score_bet: ScoreBetModel | None = await db.scalar(score_bets_to_modify(user.id, [bet_id]))
 
     if not score_bet:
         raise BetNotFound(bet_id)
@@ -244,6 +253,7 @@ def modify_score_bet(
             score_bet,
             modify_score_bet_in.team1.score if modify_score_bet_in.team1 else None,
             modify_score_bet_in.team2.score if modify_score_bet_in.team2 else None,
+            reference_data=reference_data,
         ),
     )
 
@@ -252,9 +262,9 @@ def modify_score_bet(
             score_bet.match.team1_id = modify_score_bet_in.team1.id
 
             try:
-                db.flush()
+                await db.flush()
             except IntegrityError as integrity_error:
-                db.rollback()
+                await db.rollback()
                 # team1.id is not None due to: "id" in modify_score_bet_in.team1.model_fields_set
                 # being true
                 raise TeamNotFound(modify_score_bet_in.team1.id) from integrity_error  # type: ignore[arg-type]
@@ -267,9 +277,9 @@ def modify_score_bet(
             score_bet.match.team2_id = modify_score_bet_in.team2.id
 
             try:
-                db.flush()
+                await db.flush()
             except IntegrityError as integrity_error:
-                db.rollback()
+                await db.rollback()
                 # team2.id is not None due to: "id" in modify_score_bet_in.team2.model_fields_set
                 # being true
                 raise TeamNotFound(modify_score_bet_in.team2.id) from integrity_error  # type: ignore[arg-type]
@@ -277,10 +287,20 @@ def modify_score_bet(
         if "score" in modify_score_bet_in.team2.model_fields_set:
             score_bet.score2 = modify_score_bet_in.team2.score
 
-    set_recomputation_flag(db, score_bet.match.team1_id, user.id)
-    set_recomputation_flag(db, score_bet.match.team2_id, user.id)
+    await db.run_sync(set_recomputation_flag, score_bet.match.team1_id, user.id)
+    await db.run_sync(set_recomputation_flag, score_bet.match.team2_id, user.id)
+
+    if user.role == Role.ADMIN and rules.compute_points is not None:
+        await db.flush()
+        await db.run_sync(compute_points_for_matches, user, rules.compute_points, [score_bet.match])
 
-    db.commit()
-    db.refresh(score_bet)
+    await db.run_sync(bump_version, bets_version(user.id))
 
-    return send_response(score_bet, locked=is_locked(user, lock_datetime), lang=lang)
+    await db.commit()
+
+    return send_response(
+        score_bet,
+        reference_data=reference_data,
+        locked=is_locked(user, lock_datetime),
+        lang=lang,
+    )
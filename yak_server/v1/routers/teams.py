@@ -1,15 +1,14 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.responses import FileResponse
 from pydantic import UUID4
-from sqlalchemy.orm import Session
 
-from yak_server.database.models import TeamModel
-from yak_server.helpers.database import get_db
 from yak_server.helpers.language import DEFAULT_LANGUAGE, Lang
+from yak_server.helpers.reference_data import ReferenceData, get_reference_data
 from yak_server.helpers.settings import Settings, get_settings
 from yak_server.v1.helpers.errors import TeamFlagNotFound, TeamNotFound
+from yak_server.v1.helpers.etag import check_etag, compute_etag
 from yak_server.v1.models.generic import ErrorOut, GenericOut, ValidationErrorOut
 from yak_server.v1.models.teams import AllTeamsResponse, OneTeamResponse, TeamOut
 
@@ -19,17 +18,22 @@ router = APIRouter(prefix="/teams", tags=["teams"])
 @router.get(
     "/",
     responses={
+        status.HTTP_304_NOT_MODIFIED: {"description": "Not Modified"},
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
     },
 )
 def retrieve_all_teams(
-    db: Annotated[Session, Depends(get_db)],
+    request: Request,
+    response: Response,
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[AllTeamsResponse]:
+    check_etag(request, response, compute_etag(reference_data.version, lang))
+
     return GenericOut(
         result=AllTeamsResponse(
-            teams=[TeamOut.from_instance(team, lang=lang) for team in db.query(TeamModel).all()],
+            teams=[TeamOut.from_instance(team, lang=lang) for team in reference_data.teams],
         ),
     )
 
@@ -43,11 +47,11 @@ def retrieve_all_teams(
     },
 )
 def retrieve_team_by_id(
-    team_id: str,
-    db: Annotated[Session, Depends(get_db)],
+    team_id: UUID4,
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     lang: Lang = DEFAULT_LANGUAGE,
 ) -> GenericOut[OneTeamResponse]:
-    team = db.query(TeamModel).filter_by(id=team_id).first()
+    team = reference_data.teams_by_id.get(team_id)
 
     if not team:
         raise TeamNotFound(team_id)
@@ -65,10 +69,10 @@ def retrieve_team_by_id(
 )
 def retrieve_team_flag_by_id(
     team_id: UUID4,
-    db: Annotated[Session, Depends(get_db)],
+    reference_data: Annotated[ReferenceData, Depends(get_reference_data)],
     settings: Annotated[Settings, Depends(get_settings)],
 ) -> FileResponse:
-    team = db.query(TeamModel).filter_by(id=team_id).first()
+    team = reference_data.teams_by_id.get(team_id)
 
     if not team:
         raise TeamNotFound(team_id)
@@ -3,15 +3,17 @@ from datetime import timedelta
 from secrets import compare_digest
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response, status
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from yak_server.database.models import RefreshTokenModel, Role, UserModel
 from yak_server.helpers.authentication import (
     NameAlreadyExistsError,
+    Principal,
     encode_bearer_token,
     encode_refresh_token,
+    rehash_password,
     signup_user,
 )
 from yak_server.helpers.cookies import clear_auth_cookies, set_auth_cookies
@@ -21,10 +23,12 @@ from yak_server.helpers.logging_helpers import (
     modify_password_successfully,
     signed_up_successfully,
 )
+from yak_server.helpers.password_hasher import get_password_hasher
 from yak_server.helpers.password_validator import (
     PasswordRequirements,
     PasswordRequirementsError,
 )
+from yak_server.helpers.refresh_tokens import revoke_reused_refresh_token, rotate_refresh_token
 from yak_server.helpers.rules import Rules
 from yak_server.helpers.settings import (
     AuthenticationSettings,
@@ -33,7 +37,9 @@ from yak_server.helpers.settings import (
     get_cookie_settings,
     get_rules,
 )
+from yak_server.helpers.user_cache import invalidate_cached_user
 from yak_server.v1.helpers.auth import (
+    jti_from_refresh_token,
     require_admin,
     require_refresh_token,
     require_user,
@@ -41,6 +47,7 @@ from yak_server.v1.helpers.auth import (
 )
 from yak_server.v1.helpers.errors import (
     InvalidCredentials,
+    InvalidRefreshToken,
     InvalidSignupToken,
     NameAlreadyExists,
     UnsatisfiedPasswordRequirements,
@@ -73,6 +80,7 @@ router = APIRouter(prefix="/users", tags=["users"])
         status.HTTP_409_CONFLICT: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
         status.HTTP_429_TOO_MANY_REQUESTS: {"model": ErrorOut},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ErrorOut},
     },
 )
 @auth_rate_limit
@@ -108,16 +116,24 @@ def signup(
     logger.info(signed_up_successfully(user.name))
 
     access_token = encode_bearer_token(
-        sub=user.id,
+        user=user,
         expiration_time=timedelta(seconds=auth_settings.jwt_expiration_time),
         secret_key=auth_settings.jwt_secret_key,
     )
-    refresh_token, jti = encode_refresh_token(
+    refresh_token, jti, expires_at = encode_refresh_token(
         expiration_time=timedelta(seconds=auth_settings.jwt_refresh_expiration_time),
         secret_key=auth_settings.jwt_refresh_secret_key,
     )
 
-    db.add(RefreshTokenModel(id=jti, user_id=user.id, revoked=False, replaced_by_token=None))
+    db.add(
+        RefreshTokenModel(
+            id=jti,
+            user_id=user.id,
+            revoked=False,
+            replaced_by_token=None,
+            expires_at=expires_at,
+        ),
+    )
     db.commit()
 
     set_auth_cookies(
@@ -167,6 +183,7 @@ def password_requirements() -> GenericOut[PasswordRequirementsOut]:
         status.HTTP_409_CONFLICT: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
         status.HTTP_429_TOO_MANY_REQUESTS: {"model": ErrorOut},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ErrorOut},
     },
 )
 @auth_rate_limit
@@ -174,6 +191,7 @@ def login(
     request: Request,  # ruff:ignore[unused-function-argument]
     login_in: LoginIn,
     response: Response,
+    background_tasks: BackgroundTasks,
     db: Annotated[Session, Depends(get_db)],
     auth_settings: Annotated[AuthenticationSettings, Depends(get_authentication_settings)],
     cookie_settings: Annotated[CookieSettings, Depends(get_cookie_settings)],
@@ -183,19 +201,30 @@ def login(
     if not user:
         raise InvalidCredentials
 
+    if get_password_hasher().needs_rehash(user.password):
+        background_tasks.add_task(rehash_password, user.id, user.password, login_in.password)
+
     logger.info(logged_in_successfully(user.name))
 
     access_token = encode_bearer_token(
-        sub=user.id,
+        user=user,
         expiration_time=timedelta(seconds=auth_settings.jwt_expiration_time),
         secret_key=auth_settings.jwt_secret_key,
     )
-    refresh_token, jti = encode_refresh_token(
+    refresh_token, jti, expires_at = encode_refresh_token(
         expiration_time=timedelta(seconds=auth_settings.jwt_refresh_expiration_time),
         secret_key=auth_settings.jwt_refresh_secret_key,
     )
 
-    db.add(RefreshTokenModel(id=jti, user_id=user.id, revoked=False, replaced_by_token=None))
+    db.add(
+        RefreshTokenModel(
+            id=jti,
+            user_id=user.id,
+            revoked=False,
+            replaced_by_token=None,
+            expires_at=expires_at,
+        ),
+    )
     db.commit()
 
     set_auth_cookies(
@@ -234,28 +263,26 @@ def refresh(
     auth_settings: Annotated[AuthenticationSettings, Depends(get_authentication_settings)],
     cookie_settings: Annotated[CookieSettings, Depends(get_cookie_settings)],
 ) -> GenericOut[RefreshOut]:
-    user, old_jti = user_from_refresh_token(
-        db,
-        auth_settings.jwt_refresh_secret_key,
-        refresh_token_value,
+    old_jti = jti_from_refresh_token(auth_settings.jwt_refresh_secret_key, refresh_token_value)
+
+    new_refresh_token, new_jti, expires_at = encode_refresh_token(
+        expiration_time=timedelta(seconds=auth_settings.jwt_refresh_expiration_time),
+        secret_key=auth_settings.jwt_refresh_secret_key,
     )
 
+    user = rotate_refresh_token(db, old_jti, new_jti, expires_at)
+
+    if user is None:
+        db.rollback()
+        revoke_reused_refresh_token(db, old_jti)
+        raise InvalidRefreshToken
+
     access_token = encode_bearer_token(
-        sub=user.id,
+        user=user,
         expiration_time=timedelta(seconds=auth_settings.jwt_expiration_time),
         secret_key=auth_settings.jwt_secret_key,
     )
-    new_refresh_token, new_jti = encode_refresh_token(
-        expiration_time=timedelta(seconds=auth_settings.jwt_refresh_expiration_time),
-        secret_key=auth_settings.jwt_refresh_secret_key,
-    )
 
-    db.add(RefreshTokenModel(id=new_jti, user_id=user.id, revoked=False, replaced_by_token=None))
-    db.flush()
-    db.query(RefreshTokenModel).filter_by(id=old_jti).update({
-        "revoked": True,
-        "replaced_by_token": new_jti,
-    })
     db.commit()
 
     set_auth_cookies(
@@ -284,13 +311,14 @@ def refresh(
         status.HTTP_401_UNAUTHORIZED: {"model": ErrorOut},
         status.HTTP_404_NOT_FOUND: {"model": ErrorOut},
         status.HTTP_422_UNPROCESSABLE_CONTENT: {"model": ValidationErrorOut},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ErrorOut},
     },
 )
 def modify_user(
     user_id: UUID4,
     modify_user_in: ModifyUserIn,
     db: Annotated[Session, Depends(get_db)],
-    _: Annotated[UserModel, Depends(require_admin)],
+    _: Annotated[Principal, Depends(require_admin)],
 ) -> GenericOut[CurrentUserOut]:
     user = db.query(UserModel).filter_by(id=user_id).first()
 
@@ -298,6 +326,7 @@ def modify_user(
         raise UserNotFound(user_id)
 
     user.change_password(modify_user_in.password)
+    invalidate_cached_user(db, user.id)
 
     db.commit()
 
@@ -314,7 +343,7 @@ def modify_user(
     },
 )
 def current_user(
-    user: Annotated[UserModel, Depends(require_user)],
+    user: Annotated[Principal, Depends(require_user)],
 ) -> GenericOut[CurrentUserOut]:
     return GenericOut(result=CurrentUserOut.model_validate(user))
 